@@ -2,58 +2,123 @@
 # Original scripts: streamlit6.py and FINAL_MENU_BASED_PROJECT.py
 # Version 2.0: Added Home Page and Custom Styling
 
-# 📦 Auto-install required packages
+# 📦 Dependency handling
+# Packages are checked, installed (if missing) and imported lazily, only for the
+# page that is actually opened, and only once per process thanks to st.cache_resource.
+import importlib
+import importlib.util
 import subprocess
 import sys
 
-# Combined list of required packages from both scripts
-required = [
-    "streamlit", "langchain", "langchain-google-genai", "langchain-community",
-    "fpdf", "requests", "pypdf", "protobuf==4.25.1", "proto-plus==1.23.0",
-    "beautifulsoup4", "pywhatkit", "smtplib-shim", "openai", "tweepy",
-    "instagrapi", "pandas", "scikit-learn", "mysql-connector-python",
-    "google-search-results", "pyautogui"
-]
-
-for pkg in required:
-    try:
-        # Try importing the package to see if it's installed
-        __import__(pkg.split("==")[0].replace("-", "_"))
-    except ImportError:
-        # If not installed, use pip to install it
-        package_to_install = pkg
-        if pkg == "smtplib-shim": # smtplib is built-in
-             continue
-        if pkg == "google-search-results":
-            package_to_install = "google"
-
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package_to_install])
-
-
-# 🧠 Main Imports
+# 🧠 Main Imports (standard library + Streamlit only; heavy modules load per page)
 import streamlit as st
 import os
 import re
 import tempfile
 import time
 import json
-import requests
-from fpdf import FPDF
-from bs4 import BeautifulSoup
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_core.messages import HumanMessage
-import pywhatkit
+import asyncio
+import csv
+import io
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+import hashlib
+import uuid
+import itertools
+import random
+import pickle
+import sqlite3
 import smtplib
-from openai import OpenAI
-import tweepy
-from instagrapi import Client as InstaClient
-import pandas
-from sklearn.linear_model import LinearRegression
-import mysql.connector
-from mysql.connector import Error
-from googlesearch import search
-import pyautogui
+from email.message import EmailMessage
+from email.utils import make_msgid
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Modules every Gemini-backed page needs
+LLM_MODULES = ["google.protobuf", "proto", "langchain_google_genai", "langchain_core.messages"]
+
+# Modules each page imports the first time it is selected
+PAGE_MODULES = {
+    "🏠 Home": [],
+    "📄 PDF Summarizer": LLM_MODULES + ["requests", "fpdf", "pypdf", "langchain_community.document_loaders"],
+    "🐧 Remote Linux": [],
+    "🐳 Docker Manager": [],
+    "🌐 Website Q&A": LLM_MODULES + ["requests", "bs4", "sklearn.feature_extraction.text"],
+    "🐍 Python Error Fixer": LLM_MODULES,
+    "📘 Blog Explorer": [],
+    "📱 Social & Comms": [],
+    "🤖 AI/ML Models": [],
+    "🏦 Bank Management System": ["mysql.connector", "fpdf"],
+    "🔍 Google Search": ["googlesearch"],
+}
+
+# Social & Comms and AI/ML tasks are independent, so their modules load per task
+TASK_MODULES = {
+    "WhatsApp Message": ["pywhatkit"],
+    "Email": [],
+    "Instagram Post": ["instagrapi"],
+    "Twitter Post": ["tweepy"],
+    "LinkedIn Post (Automated)": ["pyautogui"],
+    "Twilio SMS": ["twilio.rest"],
+    "Twilio Call": ["twilio.rest"],
+    "Bulk Messaging": [],
+    "Code Explainer (Gemini)": LLM_MODULES,
+    "Marks Predictor": ["pandas", "sklearn.linear_model"],
+}
+
+# pip requirement to install when a top-level module is missing
+PIP_PACKAGES = {
+    "google.protobuf": "protobuf==4.25.1",
+    "proto": "proto-plus==1.23.0",
+    "langchain_google_genai": "langchain-google-genai",
+    "langchain_core": "langchain",
+    "langchain_community": "langchain-community",
+    "fpdf": "fpdf2",
+    "bs4": "beautifulsoup4",
+    "sklearn": "scikit-learn",
+    "mysql": "mysql-connector-python",
+    "googlesearch": "google",
+}
+
+
+@st.cache_resource(show_spinner="Loading page dependencies...")
+def require(modules):
+    # Install any missing package and import the modules; cached per process,
+    # so reruns of the same page skip both the check and the import.
+    # Returns the seconds spent on the first (cold) load.
+    start = time.perf_counter()
+    for module in modules:
+        try:
+            installed = importlib.util.find_spec(module) is not None
+        except ModuleNotFoundError:
+            installed = False
+        if not installed:
+            top_level = module.split(".")[0]
+            package = PIP_PACKAGES.get(module) or PIP_PACKAGES.get(top_level, top_level)
+            subprocess.check_call([sys.executable, "-m", "pip", "install", package])
+            importlib.invalidate_caches()
+        importlib.import_module(module)
+    return time.perf_counter() - start
+
+
+def benchmark_imports(groups):
+    # Cold import time per page, each measured in a fresh interpreter
+    results = []
+    for name, modules in groups.items():
+        code = (
+            "import importlib, time\n"
+            "start = time.perf_counter()\n"
+            f"for m in {list(modules)!r}: importlib.import_module(m)\n"
+            "print(time.perf_counter() - start)"
+        )
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=300)
+        if proc.returncode == 0:
+            results.append({"Page": name, "Modules": len(modules), "Import time (s)": round(float(proc.stdout.strip()), 3)})
+        else:
+            results.append({"Page": name, "Modules": len(modules), "Import time (s)": None})
+    return results
 
 
 # Dummy Password file for functions that require it
@@ -64,6 +129,7 @@ class Password:
     twilio_number = "YOUR_TWILIO_NUMBER"
     email = "YOUR_EMAIL"
     mail_pass = "YOUR_EMAIL_PASSWORD"
+    insta_user = "YOUR_INSTA_USERNAME"
     insta_pass = "YOUR_INSTAGRAM_PASSWORD"
     twitter_consumer_key = "YOUR_TWITTER_CONSUMER_KEY"
     twitter_consumer_secret = "YOUR_TWITTER_CONSUMER_SECRET"
@@ -75,15 +141,314 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY") or "YOUR_GEMINI_API_KEY" # Replace
 GEMINI_MODEL = "gemini-1.5-pro"
 FALLBACK_MODEL = "gemini-1.5-flash"
 MAX_RETRIES = 3
+LLM_TIMEOUT = 60          # seconds per Gemini request
+LLM_SLOW_P95 = 20         # seconds; a preferred model slower than this yields to a faster one
+LLM_LATENCY_WINDOW = 50   # recent calls per model used for p50/p95
+
+# Model preference per kind of task; the router falls back down the list
+MODEL_ROUTES = {
+    "summary": [FALLBACK_MODEL, GEMINI_MODEL],    # many small map/reduce calls: fast model first
+    "chat": [FALLBACK_MODEL, GEMINI_MODEL],
+    "reasoning": [GEMINI_MODEL, FALLBACK_MODEL],  # final summaries, code fixing and explaining
+}
+
+# 📄 PDF ingestion limits
+PDF_MAX_DOWNLOAD_MB = 50
+PDF_CHUNK_SIZE = 64 * 1024
+
+# 🧠 Map-reduce summarization settings
+CHARS_PER_TOKEN = 4              # rough estimate used to turn token budgets into characters
+SUMMARY_CHUNK_TOKENS = 1000      # default token budget per map-stage chunk
+SUMMARY_FAN_OUT = 5              # default number of summaries merged per reduce call
+SUMMARY_MAX_INPUT_CHARS = 100000 # safety cap on any single prompt
+SUMMARY_PROMPTS = {
+    "page": "Summarize the following page content into 3–5 concise bullet points:\n\n",
+    "combine": "Combine the following partial summaries into one concise summary, keeping every key point:\n\n",
+    "final": "Summarize the objective, methods, and key findings from the following text:\n\n",
+}
+
+# Initialize a Gemini LLM per model (built once per process, on first use)
+@st.cache_resource(show_spinner=False)
+def get_llm(model=FALLBACK_MODEL):
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model=model,
+        google_api_key=GEMINI_API_KEY,
+        convert_system_message_to_human=True,
+        temperature=0.7,
+        timeout=LLM_TIMEOUT,
+        # ModelRouter owns retries, backoff and fallback; client-side retries
+        # would stall on one model before the router ever sees the error
+        max_retries=0
+    )
+
+# 🗄 LLM Response Cache
+# Responses are content-addressed by (model, temperature, prompt): a small
+# in-memory LRU sits in front of a SQLite file that survives restarts.
+CACHE_DIR = os.getenv("APP_CACHE_DIR", ".cache")
+LLM_CACHE_TTL = 7 * 24 * 3600   # seconds before a cached answer expires
+LLM_CACHE_MEMORY_ITEMS = 256
+LLM_CACHE_DISK_ITEMS = 5000
+
+class LLMCache:
+    def __init__(self, path, memory_items=LLM_CACHE_MEMORY_ITEMS, disk_items=LLM_CACHE_DISK_ITEMS, ttl=LLM_CACHE_TTL):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.memory = OrderedDict()
+        self.memory_items = memory_items
+        self.disk_items = disk_items
+        self.ttl = ttl
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        # The PDF summarizer calls in from worker threads, so guard everything with one lock
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT, created REAL, accessed REAL)"
+        )
+        self.db.commit()
+
+    @staticmethod
+    def make_key(model, temperature, prompt):
+        return hashlib.sha256(f"{model}|{temperature}|{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            if key in self.memory:
+                value, created = self.memory[key]
+                if now - created < self.ttl:
+                    self.memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self.memory[key]
+            row = self.db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] < self.ttl:
+                self.db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                self.db.commit()
+                self._remember(key, row[0], row[1])
+                self.stats["disk_hits"] += 1
+                return row[0]
+            self.stats["misses"] += 1
+            return None
 
-# Initialize the Gemini LLM
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",
-    google_api_key=GEMINI_API_KEY,
-    convert_system_message_to_human=True,
-    temperature=0.7,
-    stream=False
-)
+    def put(self, key, value):
+        now = time.time()
+        with self.lock:
+            self._remember(key, value, now)
+            self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, value, now, now))
+            # Evict expired rows, then the least recently used ones above the size limit
+            self.db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self.db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.disk_items,)
+            )
+            self.db.commit()
+
+    def clear(self):
+        with self.lock:
+            self.memory.clear()
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+
+    def _remember(self, key, value, created):
+        self.memory[key] = (value, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+@st.cache_resource(show_spinner=False)
+def get_llm_cache():
+    return LLMCache(os.path.join(CACHE_DIR, "llm_cache.sqlite3"))
+
+# 🧭 Model Router
+# Picks a model per task from MODEL_ROUTES, retries transient errors with
+# exponential backoff and full jitter, then falls back to the next model.
+# Rolling p50/p95 per model let a consistently slow first choice yield.
+LLM_BACKOFF_BASE = 0.5
+LLM_BACKOFF_CAP = 8
+LLM_RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+def transient_error_types():
+    transient = (TimeoutError, ConnectionError)
+    try:
+        from google.api_core import exceptions as google_errors
+        transient += (google_errors.ResourceExhausted, google_errors.ServiceUnavailable,
+                      google_errors.DeadlineExceeded, google_errors.InternalServerError)
+    except ImportError:
+        pass
+    try:
+        import requests
+        transient += (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+    except ImportError:
+        pass
+    return transient
+
+def is_retryable(error):
+    # Judged by exception type and status code, never by digits in the message.
+    # Also used for bulk sends: Gemini and Twilio errors carry the HTTP status
+    # as code/status_code/status, tweepy's on .response, SMTP's as smtp_code.
+    # Wrappers (langchain re-raises API errors) are unwrapped via the chain.
+    transient = transient_error_types()
+    while error is not None:
+        if isinstance(error, transient):
+            return True
+        response = getattr(error, "response", None)
+        for status in (getattr(error, "code", None), getattr(error, "status_code", None),
+                       getattr(error, "status", None), getattr(response, "status_code", None)):
+            if isinstance(status, int) and status in LLM_RETRYABLE_STATUS:
+                return True
+        if 400 <= (getattr(error, "smtp_code", None) or 0) < 500:  # SMTP 4xx: try again later
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+
+class ModelRouter:
+    def __init__(self, client_factory, routes=MODEL_ROUTES, retries=MAX_RETRIES, sleep=time.sleep):
+        # client_factory(model) returns an object with invoke()/stream(); tests can pass a stub
+        self.client_factory = client_factory
+        self.routes = routes
+        self.retries = retries
+        self.sleep = sleep
+        self.latencies = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def candidates(self, task):
+        order = list(self.routes[task])
+        first_p95, second_p95 = (self.p95(m) for m in order[:2]) if len(order) > 1 else (None, None)
+        if first_p95 is not None and first_p95 > LLM_SLOW_P95 and (second_p95 is None or second_p95 < first_p95):
+            order[0], order[1] = order[1], order[0]
+        return order
+
+    def p50(self, model):
+        return percentile(self.latencies.get(model, ()), 0.5)
+
+    def p95(self, model):
+        return percentile(self.latencies.get(model, ()), 0.95)
+
+    def invoke(self, task, messages):
+        # Returns (model, response)
+        return self._with_fallback(task, lambda client: client.invoke(messages))
+
+    def stream(self, task, messages):
+        # Returns (model, iterator). Retries and fallback cover the wait for the
+        # first chunk; once text has reached the page a failure is raised.
+        def first_chunk(client):
+            iterator = iter(client.stream(messages))
+            for chunk in iterator:
+                return itertools.chain([chunk], iterator)
+            return iter(())
+        return self._with_fallback(task, first_chunk, record=False)
+
+    def record(self, model, seconds, ok=True):
+        with self.lock:
+            self.latencies.setdefault(model, deque(maxlen=LLM_LATENCY_WINDOW))
+            counts = self.counts.setdefault(model, {"calls": 0, "errors": 0, "fallbacks": 0})
+            if ok:
+                self.latencies[model].append(seconds)
+                counts["calls"] += 1
+            else:
+                counts["errors"] += 1
+
+    def stats(self):
+        return [
+            {"Model": model, "Calls": c["calls"], "Errors": c["errors"], "Fallbacks to": c["fallbacks"],
+             "p50 (s)": round(self.p50(model) or 0, 2), "p95 (s)": round(self.p95(model) or 0, 2)}
+            for model, c in self.counts.items()
+        ]
+
+    def _with_fallback(self, task, call, record=True):
+        errors = []
+        for position, model in enumerate(self.candidates(task)):
+            if position:
+                with self.lock:
+                    self.counts.setdefault(model, {"calls": 0, "errors": 0, "fallbacks": 0})["fallbacks"] += 1
+            client = self.client_factory(model)
+            for attempt in range(self.retries):
+                start = time.perf_counter()
+                try:
+                    result = call(client)
+                except Exception as e:
+                    self.record(model, 0, ok=False)
+                    errors.append(f"{model}: {e}")
+                    if attempt < self.retries - 1 and is_retryable(e):
+                        self.sleep(random.uniform(0, min(LLM_BACKOFF_CAP, LLM_BACKOFF_BASE * 2 ** attempt)))
+                        continue
+                    break
+                if record:
+                    self.record(model, time.perf_counter() - start)
+                return model, result
+        raise RuntimeError("All Gemini models failed: " + "; ".join(errors))
+
+@st.cache_resource(show_spinner=False)
+def get_model_router():
+    return ModelRouter(get_llm)
+
+# ⚡ Gemini latency log: time to first token vs total time, per call
+LLM_LATENCY_LOG_SIZE = 200
+
+@st.cache_resource(show_spinner=False)
+def get_llm_latency_log():
+    return deque(maxlen=LLM_LATENCY_LOG_SIZE)
+
+def record_llm_latency(model, mode, first_token, total):
+    get_llm_latency_log().append({
+        "Model": model,
+        "Mode": mode,
+        "Time to first token (s)": round(first_token, 3),
+        "Total (s)": round(total, 3),
+    })
+
+def cached_response(prompt, task):
+    # A cached answer from any model on the task's route is good enough
+    cache = get_llm_cache()
+    for model in MODEL_ROUTES[task]:
+        cached = cache.get(cache.make_key(model, get_llm(model).temperature, prompt))
+        if cached is not None:
+            return cached
+    return None
+
+def llm_invoke(prompt, task="chat"):
+    # Single entry point for Gemini calls; returns the response text, cached
+    from langchain_core.messages import HumanMessage
+    cached = cached_response(prompt, task)
+    if cached is not None:
+        return cached
+    start = time.perf_counter()
+    model, response = get_model_router().invoke(task, [HumanMessage(content=prompt)])
+    elapsed = time.perf_counter() - start
+    record_llm_latency(model, "invoke", elapsed, elapsed)
+    get_llm_cache().put(get_llm_cache().make_key(model, get_llm(model).temperature, prompt), response.content)
+    return response.content
+
+def llm_stream(prompt, task="chat"):
+    # Like llm_invoke, but yields the answer as it is generated (for
+    # st.write_stream). Cache hits are yielded in one piece; with streaming
+    # turned off in the sidebar the whole answer arrives at once.
+    if not st.session_state.get("stream_llm", True):
+        yield llm_invoke(prompt, task)
+        return
+    from langchain_core.messages import HumanMessage
+    cached = cached_response(prompt, task)
+    if cached is not None:
+        yield cached
+        return
+    router = get_model_router()
+    start = time.perf_counter()
+    model, chunks = router.stream(task, [HumanMessage(content=prompt)])
+    first_token = time.perf_counter() - start
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk.content)
+        yield chunk.content
+    total = time.perf_counter() - start
+    router.record(model, total)
+    record_llm_latency(model, "stream", first_token, total)
+    get_llm_cache().put(get_llm_cache().make_key(model, get_llm(model).temperature, prompt), "".join(parts))
 
 # ========== Streamlit Layout & Styling ==========
 st.set_page_config(page_title="AI Automation Hub", layout="wide", page_icon="🚀")
@@ -174,33 +539,1686 @@ page = st.sidebar.radio("Select a Tool", [
 st.sidebar.markdown("---")
 st.sidebar.info("This app combines multiple AI and automation tools into a single interface.")
 
+# Load only what the selected page needs (cached for the rest of the process)
+page_load_seconds = require(tuple(PAGE_MODULES[page]))
+
+with st.sidebar.expander("⏱ Startup Benchmark"):
+    st.caption(f"This page's dependencies loaded in {page_load_seconds:.3f}s (cold, once per process).")
+    if st.button("Measure Import Time per Page"):
+        groups = {name: modules for name, modules in PAGE_MODULES.items()}
+        groups.update({f"Task: {name}": modules for name, modules in TASK_MODULES.items()})
+        groups["All pages (eager import)"] = sorted({m for ms in groups.values() for m in ms})
+        with st.spinner("Importing each page in a fresh interpreter..."):
+            st.table(benchmark_imports(groups))
+
 
 # 🔁 Reusable Functions
 def remove_emojis(text):
     return re.sub(r'[\U00010000-\U0010ffff]', '', text)
 
-def save_pdf(content):
-    pdf = FPDF()
+# 📤 Export engine
+# Documents are lists of (heading, body) sections rendered straight into
+# in-memory buffers for st.download_button; nothing is written to disk.
+# PDFs use a Unicode TTF font when one is available (fpdf2), otherwise the
+# core Latin-1 font with emojis stripped.
+EXPORT_FORMATS = {
+    "TXT": ("txt", "text/plain"),
+    "Markdown": ("md", "text/markdown"),
+    "JSON": ("json", "application/json"),
+    "PDF": ("pdf", "application/pdf"),
+}
+EXPORT_PDF_FONTS = [
+    os.getenv("EXPORT_PDF_FONT", ""),
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+]
+
+def export_txt(title, sections):
+    buffer = io.StringIO()
+    buffer.write(f"{title}\n\n")
+    for heading, body in sections:
+        buffer.write(f"{heading}:\n{body}\n\n")
+    return buffer.getvalue().encode("utf-8")
+
+def export_markdown(title, sections):
+    buffer = io.StringIO()
+    buffer.write(f"# {title}\n\n")
+    for heading, body in sections:
+        buffer.write(f"## {heading}\n\n{body}\n\n")
+    return buffer.getvalue().encode("utf-8")
+
+def export_json(title, sections):
+    document = {"title": title, "sections": [{"heading": h, "body": b} for h, b in sections]}
+    return json.dumps(document, ensure_ascii=False, indent=2).encode("utf-8")
+
+def export_pdf(title, sections):
+    import fpdf
+    # PyFPDF 1.x installs under the same module name but lacks this API
+    if int(fpdf.FPDF_VERSION.split(".")[0]) < 2:
+        raise ImportError(f"PDF export needs fpdf2 (pip install -U fpdf2); found PyFPDF {fpdf.FPDF_VERSION}")
+    pdf = fpdf.FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    for line in remove_emojis(content).split("\n"):
-        pdf.multi_cell(0, 10, line if line.strip() else " ")
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-        pdf.output(tmp.name)
-        return tmp.name
-
-def save_txt(content):
-    with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix=".txt", encoding="utf-8") as tmp:
-        tmp.write(content)
-        return tmp.name
+    font_path = next((path for path in EXPORT_PDF_FONTS if path and os.path.exists(path)), None)
+    if font_path:
+        pdf.add_font("Unicode", fname=font_path)
+        # Font files carry no emoji glyphs, so drop them rather than print blanks
+        family, clean = "Unicode", remove_emojis
+    else:
+        family = "Helvetica"
+        clean = lambda text: remove_emojis(text).encode("latin-1", "replace").decode("latin-1")
+    pdf.set_font(family, size=16)
+    # Every multi_cell returns to the left margin, else the next one has zero width
+    pdf.multi_cell(0, 9, clean(title), new_x="LMARGIN", new_y="NEXT")
+    for heading, body in sections:
+        pdf.ln(3)
+        pdf.set_font(family, size=13)
+        pdf.multi_cell(0, 8, clean(heading), new_x="LMARGIN", new_y="NEXT")
+        # One multi_cell per section instead of per line
+        pdf.set_font(family, size=11)
+        pdf.multi_cell(0, 6, clean(body) or " ", new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+EXPORTERS = {"TXT": export_txt, "Markdown": export_markdown, "JSON": export_json, "PDF": export_pdf}
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def export_document(title, sections, fmt):
+    # Cached on content so reruns (e.g. clicking another download button) don't re-render
+    return EXPORTERS[fmt](title, [tuple(section) for section in sections])
+
+def download_buttons(title, sections, file_stem, formats=tuple(EXPORT_FORMATS)):
+    columns = st.columns(len(formats))
+    for column, fmt in zip(columns, formats):
+        extension, mime = EXPORT_FORMATS[fmt]
+        try:
+            data = export_document(title, sections, fmt)
+        except Exception as e:
+            # A broken exporter only costs its own button
+            column.caption(f"❌ {fmt} export failed: {e}")
+            continue
+        column.download_button(
+            f"📥 {fmt}", data,
+            file_name=f"{file_stem}.{extension}", mime=mime, key=f"download_{file_stem}_{fmt}"
+        )
+
+def benchmark_exports(pages=500):
+    # Renders a synthetic summary of `pages` pages in every format
+    bullets = "\n".join(f"• Key finding {n}: lorem ipsum dolor sit amet, ünïcödé text — ✓" for n in range(1, 6))
+    sections = [(f"📄 Page {i}", bullets) for i in range(1, pages + 1)] + [("🧠 Overall Summary", bullets)]
+    results = []
+    for fmt, exporter in EXPORTERS.items():
+        start = time.perf_counter()
+        try:
+            data = exporter(f"Benchmark ({pages} pages)", sections)
+        except Exception as e:
+            results.append({"Format": fmt, "Seconds": None, "Size (KB)": None, "Error": str(e)})
+            continue
+        results.append({"Format": fmt, "Seconds": round(time.perf_counter() - start, 3), "Size (KB)": round(len(data) / 1024, 1)})
+    return results
+
+def chunk_text(text, max_chars, separator="\n\n"):
+    # Pack separator-delimited blocks into chunks of at most max_chars,
+    # splitting long blocks on the last space before the limit
+    chunks, current = [], ""
+    for para in text.split(separator):
+        while len(para) > max_chars:
+            cut = para.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(para[:cut])
+            para = para[cut:].lstrip()
+        if current and len(current) + len(para) + len(separator) > max_chars:
+            chunks.append(current)
+            current = para
+        else:
+            current = f"{current}{separator}{para}" if current else para
+    if current.strip() or not chunks:
+        chunks.append(current)
+    return chunks
+
+def run_concurrently(func, items, max_workers=4):
+    # Run func over items on a bounded thread pool, yielding (index, result)
+    # as each one finishes so the caller can render results immediately.
+    # Workers must not call st.* themselves; the caller renders from the script thread.
+    # If the caller stops early (e.g. a cancelled job), queued items are dropped.
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(func, item): i for i, item in enumerate(items)}
+        try:
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+# 🔌 SSH Connection Pool
+# One multiplexed OpenSSH master connection per (user, ip), shared by every
+# command and scp upload, so only the first call pays the SSH handshake.
+# Windows OpenSSH has no ControlMaster support, so there every call connects.
+SSH_CONTROL_DIR = os.path.join(tempfile.gettempdir(), "aihub-ssh")
+SSH_IDLE_TIMEOUT = 600   # seconds before an unused master connection is closed
+SSH_COMMAND_TIMEOUT = 30
+SSH_LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf")]
+
+class SSHPool:
+    def __init__(self, control_dir=SSH_CONTROL_DIR, idle_timeout=SSH_IDLE_TIMEOUT, runner=subprocess.run):
+        # runner is injectable so the pool can be driven by a fake transport
+        self.control_dir = control_dir
+        self.idle_timeout = idle_timeout
+        self.runner = runner
+        self.multiplex = os.name != "nt"
+        self.last_used = {}
+        self.latency_counts = [0] * len(SSH_LATENCY_BUCKETS)
+        self.lock = threading.Lock()
+        if self.multiplex:
+            os.makedirs(control_dir, mode=0o700, exist_ok=True)
+
+    def options(self):
+        if not self.multiplex:
+            return []
+        return [
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={self.control_dir}/%C",
+            "-o", f"ControlPersist={self.idle_timeout}s",
+        ]
+
+    def run(self, user, ip, command, timeout=SSH_COMMAND_TIMEOUT):
+        # Returns (returncode, stdout, stderr, seconds)
+        return self._timed(user, ip, ["ssh", *self.options(), f"{user}@{ip}", command], timeout)
+
+    def copy_to(self, user, ip, local_path, remote_path, timeout=SSH_COMMAND_TIMEOUT):
+        return self._timed(user, ip, ["scp", *self.options(), local_path, f"{user}@{ip}:{remote_path}"], timeout)
+
+    def evict_idle(self):
+        now = time.time()
+        with self.lock:
+            idle = [key for key, last in self.last_used.items() if now - last > self.idle_timeout]
+            for key in idle:
+                del self.last_used[key]
+        for user, ip in idle:
+            self.close(user, ip)
+
+    def close(self, user, ip):
+        with self.lock:
+            self.last_used.pop((user, ip), None)
+        if self.multiplex:
+            # Best effort: a master that won't exit just lingers until ControlPersist
+            # expires, and must not fail the command that triggered the eviction
+            try:
+                self.runner(["ssh", *self.options(), "-O", "exit", f"{user}@{ip}"], capture_output=True, text=True, timeout=10)
+            except (subprocess.SubprocessError, OSError):
+                pass
+
+    def histogram(self):
+        with self.lock:
+            counts = list(self.latency_counts)
+        return [
+            {"Latency ≤ (s)": "∞" if bound == float("inf") else bound, "Calls": count}
+            for bound, count in zip(SSH_LATENCY_BUCKETS, counts)
+        ]
+
+    def _timed(self, user, ip, args, timeout):
+        self.evict_idle()
+        start = time.perf_counter()
+        try:
+            result = self.runner(args, capture_output=True, text=True, timeout=timeout)
+            outcome = (result.returncode, result.stdout, result.stderr)
+        except Exception as e:
+            outcome = (-1, "", str(e))
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.last_used[(user, ip)] = time.time()
+            bucket = next(i for i, bound in enumerate(SSH_LATENCY_BUCKETS) if elapsed <= bound)
+            self.latency_counts[bucket] += 1
+        return (*outcome, elapsed)
+
+@st.cache_resource(show_spinner=False)
+def get_ssh_pool():
+    return SSHPool()
 
 def run_ssh_command(user, ip, command):
-    full_cmd = f'ssh {user}@{ip} "{command}"'
+    returncode, stdout, stderr, _ = get_ssh_pool().run(user, ip, command)
+    return stdout if returncode == 0 else stderr
+
+# 🖧 Multi-host execution
+SSH_FANOUT_WORKERS = 10
+
+def parse_hosts(text, first_column_only=False):
+    # Hosts separated by commas, spaces or newlines; "user@host" overrides the
+    # default user. For inventory files only the first column of each line is
+    # used and comments (#, ;) and [group] headers are skipped.
+    hosts = []
+    for line in text.splitlines():
+        line = re.split(r"[#;]", line, maxsplit=1)[0].strip()
+        if not line or line.startswith("["):
+            continue
+        tokens = re.split(r"[,\s]+", line)
+        hosts.extend(tokens[:1] if first_column_only else tokens)
+    return list(dict.fromkeys(h for h in hosts if h))
+
+def multi_host_inputs():
+    hosts_text = st.text_area("Hosts (one per line, or comma separated; user@host overrides the username)")
+    inventory = st.file_uploader("...or upload an inventory file", type=["txt", "csv", "ini"])
+    hosts = parse_hosts(hosts_text)
+    if inventory is not None:
+        hosts = list(dict.fromkeys(hosts + parse_hosts(inventory.getvalue().decode("utf-8"), first_column_only=True)))
+    col1, col2 = st.columns(2)
+    max_workers = col1.number_input("Parallel hosts", min_value=1, max_value=100, value=SSH_FANOUT_WORKERS)
+    timeout = col2.number_input("Per-host timeout (s)", min_value=1, max_value=600, value=SSH_COMMAND_TIMEOUT)
+    st.caption(f"{len(hosts)} host(s) selected.")
+    return hosts, int(max_workers), int(timeout)
+
+def run_on_hosts(user, hosts, command, max_workers=SSH_FANOUT_WORKERS, timeout=SSH_COMMAND_TIMEOUT, progress=None):
+    pool = get_ssh_pool()
+
+    def run(host):
+        host_user, _, address = host.rpartition("@")
+        returncode, stdout, stderr, seconds = pool.run(host_user or user, address, command, timeout=timeout)
+        return {
+            "Host": address,
+            "User": host_user or user,
+            "Exit status": returncode,
+            "Duration (s)": round(seconds, 3),
+            "Output": (stdout if returncode == 0 else stderr).strip(),
+        }
+
+    rows = []
+    for _, row in run_concurrently(run, hosts, max_workers=max_workers):
+        rows.append(row)
+        if progress:
+            progress(len(rows) / len(hosts), f"{len(rows)} of {len(hosts)} host(s) done")
+    return rows
+
+def ssh_job(job, user, hosts, command, max_workers, timeout):
+    return run_on_hosts(user, hosts, command, max_workers, timeout, progress=job.progress)
+
+def show_host_results(rows, elapsed):
+    failed = sum(1 for row in rows if row["Exit status"] != 0)
+    st.caption(f"{len(rows)} host(s) in {elapsed:.1f}s: {len(rows) - failed} succeeded, {failed} failed.")
+    st.dataframe(sorted(rows, key=lambda row: row["Host"]), use_container_width=True)
+
+def show_ssh_metrics():
+    pool = get_ssh_pool()
+    with st.expander("📊 SSH Connection Pool"):
+        st.write(f"Open sessions: {len(pool.last_used)} (idle timeout {pool.idle_timeout}s)")
+        st.table(pool.histogram())
+
+# 🐳 Structured Docker Inventory
+# Containers and images are parsed from `--format '{{json .}}'` and cached per
+# host. Within the TTL the cache is served as is; after that only the
+# containers named in `docker events` since the last sync are re-listed.
+DOCKER_INVENTORY_TTL = 15   # seconds a synced inventory is served without touching the host
+DOCKER_JSON_FORMAT = "--format '{{json .}}'"
+DOCKER_SIZE_UNITS = {"B": 1e-6, "KB": 1e-3, "MB": 1, "GB": 1e3, "TB": 1e6}
+
+def parse_docker_size(size):
+    # "72.8MB" / "1.2GB" / "5kB" -> megabytes
+    match = re.match(r"([\d.]+)\s*([kKMGT]?B)", size or "")
+    return round(float(match.group(1)) * DOCKER_SIZE_UNITS[match.group(2).upper()], 2) if match else None
+
+def parse_json_lines(text):
+    return [json.loads(line) for line in text.splitlines() if line.strip().startswith("{")]
+
+class DockerInventory:
+    def __init__(self, user, ip, ttl=DOCKER_INVENTORY_TTL):
+        self.user = user
+        self.ip = ip
+        self.ttl = ttl
+        self.containers = {}
+        self.images = {}
+        self.since = None      # remote clock at the last sync, for `docker events --since`
+        self.synced_at = 0.0   # local clock at the last sync, for the TTL
+        self.stats = {"full": 0, "incremental": 0, "cached": 0}
+        self.lock = threading.Lock()
+
+    def refresh(self, full=False):
+        with self.lock:
+            if not full and self.since is not None and time.time() - self.synced_at < self.ttl:
+                self.stats["cached"] += 1
+            elif full or self.since is None:
+                self._full_sync()
+                self.stats["full"] += 1
+            else:
+                self._incremental_sync()
+                self.stats["incremental"] += 1
+        return self
+
+    def _run(self, command):
+        returncode, stdout, stderr, _ = get_ssh_pool().run(self.user, self.ip, command)
+        if returncode != 0:
+            raise RuntimeError(stderr.strip() or f"'{command}' failed with exit status {returncode}")
+        return stdout
+
+    def _full_sync(self):
+        out = self._run(
+            f"date +%s; docker ps -a --no-trunc {DOCKER_JSON_FORMAT}; echo @@IMAGES; docker images --no-trunc {DOCKER_JSON_FORMAT}"
+        )
+        now, _, rest = out.partition("\n")
+        containers, _, images = rest.partition("@@IMAGES")
+        self.containers = {row["ID"]: row for row in map(self._container_row, parse_json_lines(containers))}
+        self.images = {row["ID"]: row for row in map(self._image_row, parse_json_lines(images))}
+        self._mark_synced(now)
+
+    def _incremental_sync(self):
+        out = self._run(f"now=$(date +%s); echo $now; docker events --since {self.since} --until $now {DOCKER_JSON_FORMAT}")
+        now, _, events = out.partition("\n")
+        events = parse_json_lines(events)
+        changed = {e.get("id") or e["Actor"]["ID"] for e in events if e.get("Type") == "container"}
+        if changed:
+            filters = " ".join(f"--filter id={cid}" for cid in changed)
+            fresh = {row["ID"]: row for row in map(self._container_row, parse_json_lines(
+                self._run(f"docker ps -a --no-trunc {filters} {DOCKER_JSON_FORMAT}")
+            ))}
+            for cid in changed:
+                # Containers missing from the filtered listing were removed
+                if cid in fresh:
+                    self.containers[cid] = fresh[cid]
+                else:
+                    self.containers.pop(cid, None)
+        if any(e.get("Type") == "image" for e in events):
+            # Image events carry no listing fields, and `docker images` is cheap
+            self.images = {row["ID"]: row for row in map(self._image_row, parse_json_lines(
+                self._run(f"docker images --no-trunc {DOCKER_JSON_FORMAT}")
+            ))}
+        self._mark_synced(now)
+
+    def _mark_synced(self, remote_now):
+        self.since = int(remote_now.strip())
+        self.synced_at = time.time()
+
+    @staticmethod
+    def _container_row(raw):
+        return {
+            "ID": raw["ID"],
+            "Name": raw.get("Names", ""),
+            "Image": raw.get("Image", ""),
+            "State": raw.get("State", ""),
+            "Status": raw.get("Status", ""),
+            "Created": raw.get("CreatedAt", ""),
+            "Ports": raw.get("Ports", ""),
+        }
+
+    @staticmethod
+    def _image_row(raw):
+        return {
+            "ID": raw["ID"],
+            "Repository": raw.get("Repository", ""),
+            "Tag": raw.get("Tag", ""),
+            "Size (MB)": parse_docker_size(raw.get("Size")),
+            "Created": raw.get("CreatedAt", ""),
+        }
+
+@st.cache_resource(show_spinner=False)
+def get_docker_inventory(user, ip):
+    return DockerInventory(user, ip)
+
+# 🔎 Website Retrieval Index
+# Scraped text is split into chunks and indexed with TF-IDF so each question
+# only sends the most relevant chunks. Indexes are pickled per URL.
+WEBSITE_MAX_CHARS = 500000
+RETRIEVAL_CHUNK_CHARS = 1000
+RETRIEVAL_TOP_K = 4
+WEBSITE_INDEX_DIR = os.path.join(CACHE_DIR, "website_index")
+
+# 🕸 Site crawler limits
+CRAWL_MAX_DEPTH = 1
+CRAWL_MAX_PAGES = 25
+CRAWL_CONCURRENCY = 8
+CRAWL_HOST_RATE = 5   # requests per second per host
+# Links that are never HTML are not followed, so they don't use up the page budget
+CRAWL_SKIP_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".zip", ".gz",
+                         ".tar", ".rar", ".7z", ".exe", ".dmg", ".mp3", ".mp4", ".avi", ".mov", ".css", ".js")
+
+class RetrievalIndex:
+    def __init__(self, url, text, chunk_chars=RETRIEVAL_CHUNK_CHARS):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        self.url = url
+        self.chunks = chunk_text(text, chunk_chars, separator="\n")
+        self.vectorizer = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True)
+        self.matrix = self.vectorizer.fit_transform(self.chunks)
+
+    def search(self, query, k=RETRIEVAL_TOP_K):
+        # Top-k chunks by cosine similarity (TF-IDF rows are L2-normalised),
+        # returned in document order; falls back to the first chunks on no overlap
+        scores = (self.matrix @ self.vectorizer.transform([query]).T).toarray().ravel()
+        top = [i for i in scores.argsort()[::-1][:k] if scores[i] > 0]
+        return [self.chunks[i] for i in sorted(top)] or self.chunks[:k]
+
+    @staticmethod
+    def path_for(url):
+        return os.path.join(WEBSITE_INDEX_DIR, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".pkl")
+
+    def save(self):
+        # Pickle plain attributes, not the instance: Streamlit re-defines this
+        # class on every rerun, so a pickled instance would not load back
+        os.makedirs(WEBSITE_INDEX_DIR, exist_ok=True)
+        with open(self.path_for(self.url), "wb") as f:
+            pickle.dump(vars(self), f)
+
+    @classmethod
+    def load(cls, url):
+        path = cls.path_for(url)
+        if not os.path.exists(path):
+            return None
+        index = cls.__new__(cls)
+        with open(path, "rb") as f:
+            index.__dict__.update(pickle.load(f))
+        return index
+
+# 🕸 Site crawler
+def extract_text(soup):
+    return "\n".join(el.get_text(strip=True) for el in soup.find_all(['h1','h2','h3','p','li','span']) if el.get_text(strip=True))
+
+def fetch_html(session, url):
+    # Returns the page's HTML, or None for a non-HTML response. Streamed, so
+    # only the headers of a PDF, image or archive are ever downloaded.
+    with session.get(url, timeout=10, stream=True) as r:
+        r.raise_for_status()
+        if "html" not in r.headers.get("Content-Type", ""):
+            return None
+        return r.text
+
+def crawl_website(start_url, max_depth=CRAWL_MAX_DEPTH, max_pages=CRAWL_MAX_PAGES, concurrency=CRAWL_CONCURRENCY, host_rate=CRAWL_HOST_RATE):
+    # Breadth-first crawl of same-domain links. asyncio schedules the
+    # fetches; they run on a thread pool through one requests.Session so
+    # every request shares the same keep-alive connection pool.
+    # Returns (text, stats); text starts with "❌" when nothing was fetched.
+    import requests
+    from bs4 import BeautifulSoup
+    from urllib.parse import urldefrag, urljoin, urlparse
+    domain = urlparse(start_url).netloc
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "Mozilla/5.0"
+    seen_urls, seen_hashes, pages = {start_url}, set(), []
+    stats = {"fetched": 0, "duplicates": 0, "errors": 0, "skipped": 0}
+
+    async def crawl(executor):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        host_locks, next_slot = {}, {}
+
+        async def throttle(host):
+            # Space requests to the same host at least 1 / host_rate apart
+            async with host_locks.setdefault(host, asyncio.Lock()):
+                wait = next_slot.get(host, 0) - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                next_slot[host] = loop.time() + 1 / host_rate
+
+        async def fetch(url):
+            async with semaphore:
+                await throttle(urlparse(url).netloc)
+                return await loop.run_in_executor(executor, fetch_html, session, url)
+
+        frontier = [start_url]
+        for depth in range(max_depth + 1):
+            batch = frontier[:max_pages - stats["fetched"]]
+            if not batch:
+                break
+            responses = await asyncio.gather(*(fetch(url) for url in batch), return_exceptions=True)
+            frontier = []
+            for url, html in zip(batch, responses):
+                stats["fetched"] += 1
+                if isinstance(html, Exception):
+                    stats["errors"] += 1
+                    continue
+                if html is None:
+                    stats["skipped"] += 1
+                    continue
+                soup = BeautifulSoup(html, "html.parser")
+                text = extract_text(soup)
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                if digest in seen_hashes:
+                    stats["duplicates"] += 1
+                elif text:
+                    seen_hashes.add(digest)
+                    pages.append(f"# {url}\n{text}")
+                if depth < max_depth:
+                    for a in soup.find_all("a", href=True):
+                        link = urldefrag(urljoin(url, a["href"]))[0]
+                        parsed = urlparse(link)
+                        if (parsed.scheme in ("http", "https") and parsed.netloc == domain and link not in seen_urls
+                                and not parsed.path.lower().endswith(CRAWL_SKIP_EXTENSIONS)):
+                            seen_urls.add(link)
+                            frontier.append(link)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        asyncio.run(crawl(executor))
+    session.close()
+    if not pages:
+        return "❌ Error crawling website: no pages could be fetched.", stats
+    return "\n\n".join(pages)[:WEBSITE_MAX_CHARS], stats
+
+# 💬 Chat memory
+# Keeps the prompt's chat history under a token budget: once it is exceeded,
+# all but the most recent turns are folded into a running LLM summary.
+CHAT_HISTORY_TOKEN_BUDGET = 1500
+CHAT_KEEP_RECENT_TURNS = 4   # messages (not question/answer pairs) kept verbatim
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN
+
+class ChatMemory:
+    def __init__(self, budget=CHAT_HISTORY_TOKEN_BUDGET, keep_recent=CHAT_KEEP_RECENT_TURNS):
+        self.budget = budget
+        self.keep_recent = keep_recent
+        self.summary = ""
+        self.turns = []
+        self.uncompacted_chars = 0   # size the history would have without compaction
+        self.prompt_sizes = []
+
+    def render(self):
+        text = f"Summary of the earlier conversation: {self.summary}\n" if self.summary else ""
+        return text + "".join(f"{msg['role']}: {msg['text']}\n" for msg in self.turns)
+
+    def add(self, role, text):
+        self.turns.append({"role": role, "text": text})
+        self.uncompacted_chars += len(f"{role}: {text}\n")
+        if estimate_tokens(self.render()) > self.budget and len(self.turns) > self.keep_recent:
+            self._compact()
+
+    def record_prompt(self, prompt):
+        self.prompt_sizes.append({
+            "Prompt tokens": estimate_tokens(prompt),
+            "History tokens": estimate_tokens(self.render()),
+            "Uncompacted history tokens": self.uncompacted_chars // CHARS_PER_TOKEN,
+        })
+
+    def _compact(self):
+        older, recent = self.turns[:-self.keep_recent], self.turns[-self.keep_recent:]
+        transcript = "".join(f"{msg['role']}: {msg['text']}\n" for msg in older)
+        prompt = (
+            "Update the running summary of a conversation with the new messages below. "
+            "Keep facts, names and open questions; answer with the summary only.\n\n"
+            f"CURRENT SUMMARY:\n{self.summary or '(none)'}\n\nNEW MESSAGES:\n{transcript}"
+        )
+        try:
+            self.summary = llm_invoke(prompt, task="summary")
+        except Exception:
+            return   # keep the turns verbatim and try again after the next message
+        self.turns = recent
+
+# 🏦 MySQL Connection Pool
+# One pool per process (st.cache_resource), so widget interactions reuse an
+# open connection instead of paying a TCP + auth handshake on every rerun.
+BMS_DB_CONFIG = {"host": "localhost", "user": "root", "password": "YOUR_MYSQL_PASSWORD", "database": "bms"}
+BMS_POOL_SIZE = int(os.getenv("BMS_POOL_SIZE", "5"))
+BMS_POOL_TIMEOUT = 10   # seconds to wait for a free connection
+
+def mysql_pool_factory(size, config):
+    from mysql.connector import pooling
+    return pooling.MySQLConnectionPool(pool_name="bms", pool_size=size, pool_reset_session=True, **config)
+
+class MySQLPool:
+    def __init__(self, size=BMS_POOL_SIZE, config=BMS_DB_CONFIG, pool_factory=mysql_pool_factory):
+        # pool_factory(size, config) returns an object whose get_connection()
+        # hands out connections that close() back into it; injectable so the
+        # pool can be driven by a stand-in (e.g. SQLite) in tests
+        self.size = size
+        self.pool = pool_factory(size, config)
+        # mysql.connector fails at once when the pool is empty; the semaphore makes callers wait instead
+        self.slots = threading.BoundedSemaphore(size)
+        self.stats = {"checkouts": 0, "in_use": 0, "peak_in_use": 0, "wait_total": 0.0, "wait_max": 0.0}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def connection(self, timeout=BMS_POOL_TIMEOUT):
+        from mysql.connector import Error
+        start = time.perf_counter()
+        if not self.slots.acquire(timeout=timeout):
+            raise Error(msg=f"Timed out after {timeout}s waiting for a pooled MySQL connection")
+        waited = time.perf_counter() - start
+        conn = None
+        try:
+            # get_connection() already pings and reconnects a dropped connection
+            conn = self.pool.get_connection()
+            with self.lock:
+                self.stats["checkouts"] += 1
+                self.stats["in_use"] += 1
+                self.stats["peak_in_use"] = max(self.stats["peak_in_use"], self.stats["in_use"])
+                self.stats["wait_total"] += waited
+                self.stats["wait_max"] = max(self.stats["wait_max"], waited)
+            try:
+                yield conn
+            finally:
+                with self.lock:
+                    self.stats["in_use"] -= 1
+        finally:
+            if conn is not None:
+                conn.close()  # returns a pooled connection to the pool
+            self.slots.release()
+
+@st.cache_resource(show_spinner=False)
+def get_bms_pool():
+    return MySQLPool()
+
+# 📑 Keyset pagination
+# Pages are fetched with "WHERE (sort, id) after the last row seen ... LIMIT n"
+# rather than OFFSET, so each page is one index range scan and only one
+# page of rows is ever held in the app.
+BMS_PAGE_SIZE = 50
+BMS_INDEXES = {
+    # index name: (table, columns); InnoDB appends the primary key to each
+    "idx_transactions_user_created": ("transactions", "user_id, created_at"),
+    "idx_transactions_user_amount": ("transactions", "user_id, amount"),
+    "idx_users_name": ("users", "name"),
+    "idx_users_email": ("users", "email"),
+    "idx_users_balance": ("users", "balance"),
+}
+BMS_SNAPSHOT_DDL = (
+    "CREATE TABLE IF NOT EXISTS balance_snapshots ("
+    "user_id INT NOT NULL, snapshot_date DATE NOT NULL, balance DECIMAL(15, 2) NOT NULL, "
+    "PRIMARY KEY (user_id, snapshot_date))"
+)
+
+@st.cache_resource(show_spinner="Checking database indexes...")
+def migrate_bms_schema():
+    # Create any missing index or table once per process; returns the indexes created
+    created = []
+    with get_bms_pool().connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(BMS_SNAPSHOT_DDL)
+        cursor.execute(
+            "SELECT DISTINCT index_name FROM information_schema.statistics "
+            "WHERE table_schema = DATABASE() AND table_name IN ('users', 'transactions')"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        for name, (table, columns) in BMS_INDEXES.items():
+            if name not in existing:
+                cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+                created.append(name)
+        cursor.close()
+    return created
+
+def fetch_keyset_page(connection, table, columns, sort, descending, where, params, after, page_size=BMS_PAGE_SIZE):
+    # `sort` must come from a fixed whitelist; `after` is (sort value, id) of the
+    # previous page's last row, or None for the first page
+    op, order = ("<", "DESC") if descending else (">", "ASC")
+    clauses, args = list(where), list(params)
+    if after is not None:
+        if sort == "id":
+            clauses.append(f"id {op} %s")
+            args.append(after[1])
+        else:
+            clauses.append(f"({sort} {op} %s OR ({sort} = %s AND id {op} %s))")
+            args += [after[0], after[0], after[1]]
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {sort} {order}, id {order} LIMIT %s"
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute(sql, (*args, page_size + 1))
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows[:page_size], len(rows) > page_size
+
+def paginated_table(connection, key, table, columns, sort, descending, where, params, page_size=BMS_PAGE_SIZE):
+    # Keeps a stack of page cursors in session_state; any change to the
+    # query (filters, sort, page size) starts again from the first page
+    signature = (table, sort, descending, tuple(where), tuple(params), page_size)
+    state = st.session_state.setdefault(key, {"signature": signature, "cursors": [None]})
+    if state["signature"] != signature:
+        state.update(signature=signature, cursors=[None])
+    rows, has_next = fetch_keyset_page(connection, table, columns, sort, descending, where, params, state["cursors"][-1], page_size)
+    st.table(rows)
+    col1, col2, col3 = st.columns([1, 1, 4])
+    col3.caption(f"Page {len(state['cursors'])} · {len(rows)} row(s)")
+    if col1.button("⬅ Previous", key=f"{key}_prev", disabled=len(state["cursors"]) == 1):
+        state["cursors"].pop()
+        st.rerun()
+    if col2.button("Next ➡", key=f"{key}_next", disabled=not has_next):
+        state["cursors"].append((rows[-1][sort], rows[-1]["id"]))
+        st.rerun()
+
+# 📥 Bulk transaction ingestion
+# Rows are validated, then applied in chunks: each chunk locks its users,
+# checks running balances in Python and writes with executemany in a
+# single transaction.
+BMS_BULK_CHUNK_SIZE = 1000
+BMS_TRANSACTION_TYPES = ("deposit", "withdrawal")
+
+def parse_transaction_upload(file_name, data):
+    # CSV (with a header row) or a JSON list of objects, each with user_id, type
+    # and amount. Yields (row number, raw dict).
+    text = data.decode("utf-8-sig")
+    if file_name.lower().endswith(".json"):
+        records = json.loads(text)
+        if not isinstance(records, list):
+            raise ValueError("JSON upload must be a list of objects.")
+        yield from enumerate(records, start=1)
+    else:
+        # line_num counts physical lines, so blank lines and quoted
+        # multi-line fields don't shift the reported line
+        reader = csv.DictReader(io.StringIO(text))
+        try:
+            for raw in reader:
+                yield reader.line_num, raw
+        except csv.Error as e:
+            raise ValueError(f"malformed CSV at line {reader.line_num}: {e}")
+
+BMS_MAX_AMOUNT = Decimal(10) ** 13   # DECIMAL(15,2): 13 integer digits
+
+def validate_transaction(raw):
+    # Returns ((user_id, type, amount), None) or (None, reason)
+    if not isinstance(raw, dict):
+        return None, "row is not an object"
+    try:
+        user_id = int(str(raw.get("user_id", "")).strip())
+    except ValueError:
+        return None, f"invalid user_id {raw.get('user_id')!r}"
+    tx_type = str(raw.get("type", "")).strip().lower()
+    if tx_type not in BMS_TRANSACTION_TYPES:
+        return None, f"type must be one of {', '.join(BMS_TRANSACTION_TYPES)}"
     try:
-        result = subprocess.run(full_cmd, shell=True, capture_output=True, text=True, timeout=30)
-        return result.stdout if result.returncode == 0 else result.stderr
-    except Exception as e:
-        return str(e)
+        amount = Decimal(str(raw.get("amount", "")).strip())
+    except InvalidOperation:
+        return None, f"invalid amount {raw.get('amount')!r}"
+    if user_id < 1 or not amount.is_finite() or amount <= 0:
+        return None, "user_id and amount must be positive"
+    # Must fit the DECIMAL(15,2) columns exactly, or MySQL rounds or rejects it
+    if amount >= BMS_MAX_AMOUNT:
+        return None, f"amount {amount} is too large"
+    cents = amount.quantize(Decimal("0.01"))
+    if cents != amount:
+        return None, f"amount {amount} has more than 2 decimal places"
+    return (user_id, tx_type, cents), None
+
+def apply_transaction_chunk(connection, chunk):
+    # chunk: list of (row number, (user_id, type, amount)). Returns rejected rows.
+    user_ids = sorted({tx[0] for _, tx in chunk})
+    cursor = connection.cursor()
+    try:
+        # Lock in id order so concurrent batches cannot deadlock each other
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        cursor.execute(f"SELECT id, balance FROM users WHERE id IN ({placeholders}) ORDER BY id FOR UPDATE", user_ids)
+        balances = {uid: Decimal(str(balance)) for uid, balance in cursor.fetchall()}
+        accepted, rejected, deltas = [], [], {}
+        for row_number, (user_id, tx_type, amount) in chunk:
+            if user_id not in balances:
+                rejected.append({"Row": row_number, "Reason": f"user {user_id} not found"})
+                continue
+            delta = amount if tx_type == "deposit" else -amount
+            if balances[user_id] + delta < 0:
+                rejected.append({"Row": row_number, "Reason": f"insufficient balance for user {user_id}"})
+                continue
+            balances[user_id] += delta
+            deltas[user_id] = deltas.get(user_id, Decimal(0)) + delta
+            accepted.append((user_id, tx_type, amount))
+        if accepted:
+            cursor.executemany("INSERT INTO transactions (user_id, type, amount) VALUES (%s, %s, %s)", accepted)
+            cursor.executemany("UPDATE users SET balance = balance + %s WHERE id = %s", [(d, uid) for uid, d in deltas.items()])
+        connection.commit()
+        return len(accepted), rejected
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def ingest_transactions(connection, records, chunk_size=BMS_BULK_CHUNK_SIZE, progress=None):
+    # records: iterable of (row number, raw dict). Returns (applied, rejected rows, seconds).
+    # Every row not applied ends up in the rejected rows, so earlier chunks
+    # staying committed after a failure is always visible to the caller.
+    from mysql.connector import Error
+    start = time.perf_counter()
+    applied, rejected, chunk = 0, [], []
+
+    def flush():
+        nonlocal applied
+        try:
+            count, chunk_rejected = apply_transaction_chunk(connection, chunk)
+        except Error as e:
+            # The chunk was rolled back as a whole; later chunks still run
+            count, chunk_rejected = 0, [{"Row": row_number, "Reason": f"database error: {e}"} for row_number, _ in chunk]
+        applied += count
+        rejected.extend(chunk_rejected)
+        chunk.clear()
+        if progress:
+            progress(applied, len(rejected))
+
+    rows, last_row = iter(records), 0
+    while True:
+        try:
+            row_number, raw = next(rows)
+        except StopIteration:
+            break
+        except ValueError as e:
+            # Unreadable input: apply what was read before it and report the rest as not read
+            rejected.append({"Row": last_row + 1, "Reason": f"{e}; nothing after this was read"})
+            break
+        last_row = row_number
+        tx, reason = validate_transaction(raw)
+        if reason:
+            rejected.append({"Row": row_number, "Reason": reason})
+            continue
+        chunk.append((row_number, tx))
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return applied, sorted(rejected, key=lambda r: r["Row"]), time.perf_counter() - start
+
+# 🔒 Concurrency-safe withdrawals
+# The balance check and the debit are one conditional UPDATE, so two sessions
+# can never both pass the check; deadlocks and lock timeouts are retried.
+BMS_WITHDRAW_RETRIES = 5
+BMS_RETRYABLE_ERRORS = (1205, 1213)   # lock wait timeout, deadlock
+
+def withdraw(connection, user_id, amount, retries=BMS_WITHDRAW_RETRIES):
+    # Returns True if the withdrawal was applied, False on insufficient balance or unknown user
+    from mysql.connector import Error
+    for attempt in range(retries):
+        cursor = connection.cursor()
+        try:
+            cursor.execute("UPDATE users SET balance = balance - %s WHERE id = %s AND balance >= %s", (amount, user_id, amount))
+            if cursor.rowcount == 0:
+                connection.rollback()
+                return False
+            cursor.execute("INSERT INTO transactions (user_id, type, amount) VALUES (%s, 'withdrawal', %s)", (user_id, amount))
+            connection.commit()
+            return True
+        except Error as e:
+            connection.rollback()
+            if e.errno in BMS_RETRYABLE_ERRORS and attempt < retries - 1:
+                time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+                continue
+            raise
+        finally:
+            cursor.close()
+    return False
+
+def benchmark_withdrawals(pool, threads, withdrawals_per_thread, amount=Decimal("1.00")):
+    # Hammers one throw-away account from `threads` pooled connections. The
+    # balance covers only half the attempts, so the rest must be refused.
+    attempts = threads * withdrawals_per_thread
+    opening = amount * (attempts // 2)
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute("INSERT INTO users (name, email, balance) VALUES ('benchmark', 'benchmark@localhost', %s)", (opening,))
+        user_id = cursor.lastrowid
+        connection.commit()
+        cursor.close()
+
+    def worker(_):
+        with pool.connection() as connection:
+            return sum(withdraw(connection, user_id, amount) for _ in range(withdrawals_per_thread))
+
+    try:
+        start = time.perf_counter()
+        succeeded = sum(result for _, result in run_concurrently(worker, range(threads), max_workers=threads))
+        seconds = time.perf_counter() - start
+        with pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT balance FROM users WHERE id = %s", (user_id,))
+            closing = Decimal(str(cursor.fetchone()[0]))
+            cursor.execute("SELECT COUNT(*) FROM users WHERE balance < 0")
+            negative_accounts = cursor.fetchone()[0]
+            cursor.close()
+    finally:
+        with pool.connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("DELETE FROM transactions WHERE user_id = %s", (user_id,))
+            cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+            connection.commit()
+            cursor.close()
+    return {
+        "Threads": threads,
+        "Attempts": attempts,
+        "Succeeded": succeeded,
+        "Transactions/sec": round(attempts / seconds, 1) if seconds else None,
+        "Closing balance": closing,
+        "Balance consistent": closing == opening - amount * succeeded and closing >= 0,
+        "Negative balances": negative_accounts,
+    }
+
+# 🧾 Balance snapshots & statements
+# balance_snapshots holds each user's balance at the start of every month.
+# Transactions are append-only and always stamped "now", so a snapshot never
+# changes once its month has started: refreshing only adds the boundaries
+# since the user's latest snapshot. Any balance-as-of is then the nearest
+# snapshot plus at most about a month of transactions.
+BMS_EPOCH = date(1000, 1, 1)   # earliest DATETIME MySQL supports
+BMS_SIGNED_AMOUNT = "CASE WHEN type = 'deposit' THEN amount ELSE -amount END"
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def net_change(cursor, user_id, start, end):
+    cursor.execute(
+        f"SELECT COALESCE(SUM({BMS_SIGNED_AMOUNT}), 0) FROM transactions "
+        "WHERE user_id = %s AND created_at >= %s AND created_at < %s",
+        (user_id, start, end)
+    )
+    return Decimal(str(cursor.fetchone()[0]))
+
+def refresh_snapshots(connection, user_id):
+    # Returns the number of snapshots added. Users.balance includes the opening
+    # balance given at creation (which has no transaction row), so history is
+    # rebuilt backwards from the current balance rather than forwards from zero.
+    current = date.today().replace(day=1)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT MAX(snapshot_date) FROM balance_snapshots WHERE user_id = %s", (user_id,))
+        last = cursor.fetchone()[0]
+        if last == current:
+            return 0
+        # One statement, so the balance and the monthly totals come from the same read view
+        cursor.execute(
+            f"SELECT u.balance, DATE_FORMAT(t.created_at, '%%Y-%%m-01'), SUM({BMS_SIGNED_AMOUNT}) "
+            "FROM users u LEFT JOIN transactions t ON t.user_id = u.id AND t.created_at >= %s "
+            "WHERE u.id = %s GROUP BY u.balance, DATE_FORMAT(t.created_at, '%%Y-%%m-01')",
+            (next_month(last) if last else BMS_EPOCH, user_id)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+        balance = Decimal(str(rows[0][0]))
+        monthly = {datetime.strptime(m, "%Y-%m-%d").date(): Decimal(str(net)) for _, m, net in rows if m}
+        first = next_month(last) if last else min([current, *monthly])
+        boundaries = []
+        day = first
+        while day <= current:
+            boundaries.append(day)
+            day = next_month(day)
+        # Walk backwards from today's balance, peeling off one month at a time
+        balance -= sum(net for month, net in monthly.items() if month >= current)
+        snapshots = []
+        for boundary in reversed(boundaries):
+            if boundary < current:
+                balance -= monthly.get(boundary, Decimal(0))
+            snapshots.append((user_id, boundary, balance))
+        cursor.executemany("INSERT IGNORE INTO balance_snapshots (user_id, snapshot_date, balance) VALUES (%s, %s, %s)", snapshots)
+        connection.commit()
+        return len(snapshots)
+    finally:
+        cursor.close()
+
+def refresh_all_snapshots(connection, batch_size=500):
+    added, after = 0, 0
+    while True:
+        cursor = connection.cursor()
+        cursor.execute("SELECT id FROM users WHERE id > %s ORDER BY id LIMIT %s", (after, batch_size))
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        if not ids:
+            return added
+        for user_id in ids:
+            added += refresh_snapshots(connection, user_id)
+        after = ids[-1]
+
+def balance_as_of(connection, user_id, moment):
+    # Balance at the start of `moment` (a date), from the nearest snapshot plus a bounded delta
+    cursor = connection.cursor()
+    try:
+        cursor.execute(
+            "SELECT snapshot_date, balance FROM balance_snapshots WHERE user_id = %s AND snapshot_date <= %s "
+            "ORDER BY snapshot_date DESC LIMIT 1", (user_id, moment)
+        )
+        row = cursor.fetchone()
+        if row:
+            return Decimal(str(row[1])) + net_change(cursor, user_id, row[0], moment)
+        # Before the first snapshot: step back from the earliest one
+        cursor.execute(
+            "SELECT snapshot_date, balance FROM balance_snapshots WHERE user_id = %s "
+            "ORDER BY snapshot_date LIMIT 1", (user_id,)
+        )
+        row = cursor.fetchone()
+        if row:
+            return Decimal(str(row[1])) - net_change(cursor, user_id, moment, row[0])
+        cursor.execute("SELECT balance FROM users WHERE id = %s", (user_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return Decimal(str(row[0])) - net_change(cursor, user_id, moment, date(9999, 12, 31))
+    finally:
+        cursor.close()
+
+def generate_statement(connection, user_id, start, end):
+    # Statement for [start, end); returns None for an unknown user
+    refresh_snapshots(connection, user_id)
+    opening = balance_as_of(connection, user_id, start)
+    if opening is None:
+        return None
+    closing = balance_as_of(connection, user_id, end)
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute(
+        "SELECT created_at, type, amount FROM transactions WHERE user_id = %s AND created_at >= %s AND created_at < %s "
+        "ORDER BY created_at, id", (user_id, start, end)
+    )
+    transactions = cursor.fetchall()
+    cursor.close()
+    return {"user_id": user_id, "start": start, "end": end, "opening": opening, "closing": closing, "transactions": transactions}
+
+def format_statement(statement):
+    lines = [
+        f"Account Statement — User ID {statement['user_id']}",
+        f"Period: {statement['start']} to {statement['end'] - timedelta(days=1)}",
+        f"Opening balance: {statement['opening']:.2f}",
+        "",
+    ]
+    for tx in statement["transactions"]:
+        sign = "+" if tx["type"] == "deposit" else "-"
+        lines.append(f"{tx['created_at']}  {tx['type']:<10}  {sign}{Decimal(str(tx['amount'])):.2f}")
+    lines += ["", f"Closing balance: {statement['closing']:.2f}"]
+    return "\n".join(lines)
+
+# 📈 Marks Predictor model cache
+# The fitted model is cached per content hash of the CSV; the hash itself is
+# cached per (mtime, size), so a rerun only stats the file. Training streams
+# the CSV in chunks and merges per-chunk means and co-moments (Chan et al.),
+# which gives the exact least-squares line in constant memory. The fit is
+# saved to disk so a restarted app loads it without touching the CSV.
+MARKS_CSV = "marks.csv"
+MARKS_MODEL_PATH = os.path.join(CACHE_DIR, "marks_model.json")
+MARKS_CHUNK_ROWS = 500000
+
+class MarksModel:
+    def __init__(self, coef, intercept, rows):
+        self.coef = coef
+        self.intercept = intercept
+        self.rows = rows
+
+    def predict(self, x):
+        import numpy
+        return numpy.asarray(x, dtype=float)[:, 0] * self.coef + self.intercept
+
+def fit_marks_streaming(path, chunk_rows=MARKS_CHUNK_ROWS):
+    import pandas
+    n = mean_x = mean_y = cxx = cxy = 0.0
+    for chunk in pandas.read_csv(path, usecols=["hrs", "marks"], dtype="float64", chunksize=chunk_rows):
+        chunk = chunk.dropna()
+        if chunk.empty:
+            continue
+        x, y = chunk["hrs"].values, chunk["marks"].values
+        nb, mx, my = len(x), x.mean(), y.mean()
+        dx, dy, total = mx - mean_x, my - mean_y, n + nb
+        cxx += ((x - mx) ** 2).sum() + dx * dx * n * nb / total
+        cxy += ((x - mx) * (y - my)).sum() + dx * dy * n * nb / total
+        mean_x += dx * nb / total
+        mean_y += dy * nb / total
+        n = total
+    if n < 2 or cxx == 0:
+        raise ValueError("marks data needs at least two distinct 'hrs' values")
+    coef = cxy / cxx
+    return MarksModel(float(coef), float(mean_y - coef * mean_x), int(n))
+
+def compare_marks_training(path):
+    # Training time and peak traced memory: full load + LinearRegression vs streaming
+    import tracemalloc
+    import pandas
+    from sklearn.linear_model import LinearRegression
+
+    def full_load():
+        data = pandas.read_csv(path)
+        LinearRegression().fit(data[["hrs"]].values, data["marks"].values)
+
+    results = []
+    for name, train in [("Full load (LinearRegression)", full_load), ("Streaming (chunked)", lambda: fit_marks_streaming(path))]:
+        tracemalloc.start()
+        start = time.perf_counter()
+        train()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        results.append({"Approach": name, "Training time (s)": round(seconds, 3), "Peak memory (MB)": round(peak / 1e6, 1)})
+    return results
+
+def write_sample_marks(path, rows, chunk_rows=MARKS_CHUNK_ROWS):
+    # Synthetic marks ≈ 10 × hours + noise, written in chunks
+    import numpy
+    import pandas
+    rng = numpy.random.default_rng(0)
+    for offset in range(0, rows, chunk_rows):
+        hrs = rng.uniform(0, 10, min(chunk_rows, rows - offset)).round(2)
+        chunk = pandas.DataFrame({"hrs": hrs, "marks": (hrs * 10 + rng.normal(0, 5, len(hrs))).round(2)})
+        chunk.to_csv(path, mode="w" if offset == 0 else "a", header=offset == 0, index=False)
+
+@st.cache_data(show_spinner=False)
+def file_sha256(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+@st.cache_resource(show_spinner="Training model...")
+def train_marks_model(path, content_hash):
+    # Reuse the model saved for this exact data, otherwise train and save it
+    if os.path.exists(MARKS_MODEL_PATH):
+        with open(MARKS_MODEL_PATH) as f:
+            saved = json.load(f)
+        if saved.get("path") == os.path.abspath(path) and saved.get("sha256") == content_hash:
+            return MarksModel(saved["coef"], saved["intercept"], saved["rows"])
+    model = fit_marks_streaming(path)
+    os.makedirs(os.path.dirname(MARKS_MODEL_PATH), exist_ok=True)
+    with open(MARKS_MODEL_PATH, "w") as f:
+        json.dump({"path": os.path.abspath(path), "sha256": content_hash, **vars(model)}, f)
+    return model
+
+def load_marks_model(path=MARKS_CSV):
+    info = os.stat(path)
+    return train_marks_model(path, file_sha256(path, info.st_mtime_ns, info.st_size))
+
+# 🗂 Background Jobs
+# Long-running work is submitted to an in-process worker pool and tracked in
+# SQLite, so users can keep using other pages and results survive a reload.
+# Job functions run on worker threads: they must not call st.* and should
+# return JSON-serialisable results.
+JOB_WORKERS = 4
+JOB_DB_PATH = os.path.join(CACHE_DIR, "jobs.sqlite3")
+JOB_PANEL_SIZE = 10
+
+class JobCancelled(Exception):
+    pass
+
+class JobContext:
+    # Handed to every job function for progress reporting and cancellation
+    def __init__(self, queue, job_id, cancel_event):
+        self.queue = queue
+        self.job_id = job_id
+        self.cancel_event = cancel_event
+
+    def progress(self, fraction, message=""):
+        self.check_cancelled()
+        self.queue._update(self.job_id, progress=min(max(fraction, 0.0), 1.0), message=message)
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def sleep(self, seconds):
+        # Interruptible sleep: returns early (by raising) when the job is cancelled
+        if self.cancel_event.wait(seconds):
+            raise JobCancelled()
+
+class JobQueue:
+    def __init__(self, path=JOB_DB_PATH, workers=JOB_WORKERS):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.cancel_events = {}
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT, title TEXT, status TEXT, "
+            "progress REAL, message TEXT, result TEXT, error TEXT, created REAL, finished REAL)"
+        )
+        # Jobs from a previous process can never finish
+        self.db.execute("UPDATE jobs SET status = 'interrupted', finished = ? WHERE status IN ('queued', 'running')", (time.time(),))
+        self.db.commit()
+
+    def submit(self, kind, title, func, *args):
+        job_id = uuid.uuid4().hex[:8]
+        cancel_event = threading.Event()
+        with self.lock:
+            self.cancel_events[job_id] = cancel_event
+            self.db.execute(
+                "INSERT INTO jobs (id, kind, title, status, progress, message, created) VALUES (?, ?, ?, 'queued', 0, '', ?)",
+                (job_id, kind, title, time.time())
+            )
+            self.db.commit()
+        self.executor.submit(self._run, job_id, func, args, cancel_event)
+        return job_id
+
+    def cancel(self, job_id):
+        with self.lock:
+            event = self.cancel_events.get(job_id)
+        if event:
+            event.set()
+
+    def list(self, limit=JOB_PANEL_SIZE):
+        with self.lock:
+            rows = self.db.execute("SELECT * FROM jobs ORDER BY created DESC LIMIT ?", (limit,)).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def get(self, job_id):
+        with self.lock:
+            row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def _run(self, job_id, func, args, cancel_event):
+        context = JobContext(self, job_id, cancel_event)
+        try:
+            context.check_cancelled()
+            self._update(job_id, status="running")
+            result = func(context, *args)
+            self._update(job_id, status="done", progress=1.0, result=json.dumps(result, default=str), finished=time.time())
+        except JobCancelled:
+            self._update(job_id, status="cancelled", finished=time.time())
+        except Exception as e:
+            self._update(job_id, status="failed", error=str(e), finished=time.time())
+        finally:
+            with self.lock:
+                self.cancel_events.pop(job_id, None)
+
+    def _update(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self.lock:
+            self.db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self.db.commit()
+
+    @staticmethod
+    def _to_dict(row):
+        keys = ["id", "kind", "title", "status", "progress", "message", "result", "error", "created", "finished"]
+        job = dict(zip(keys, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+@st.cache_resource(show_spinner=False)
+def get_job_queue():
+    return JobQueue()
+
+def submit_job(kind, title, func, *args):
+    job_id = get_job_queue().submit(kind, title, func, *args)
+    st.success(f"🗂 Started background job `{job_id}`: {title}. Track it under Jobs in the sidebar.")
+    return job_id
+
+def show_job_result(job):
+    result = job["result"]
+    if job["kind"] == "pdf_summary":
+        sections = [tuple(section) for section in result["sections"]]
+        for heading, body in sections:
+            st.markdown(f"**{heading}**")
+            st.markdown(body)
+        download_buttons("PDF Summary", sections, f"summary_{job['id']}")
+    elif job["kind"] == "ssh":
+        st.dataframe(sorted(result, key=lambda row: row["Host"]), use_container_width=True)
+    else:
+        st.write(result)
+
+# 🔑 Social Clients
+# Provider clients are built (and logged in) once per process and shared by
+# every rerun, session and job. Instagram's session cookies are saved to disk
+# so even a restart reuses the login instead of triggering a fresh one.
+# Clients are revalidated lazily: only when fetched after CLIENT_REVALIDATE_SECONDS.
+INSTAGRAM_SESSION_PATH = os.path.join(CACHE_DIR, "instagram_session.json")
+CLIENT_REVALIDATE_SECONDS = 30 * 60
+
+def build_instagram_client():
+    from instagrapi import Client as InstaClient
+    client = InstaClient()
+    if os.path.exists(INSTAGRAM_SESSION_PATH):
+        # login() with loaded settings resumes the saved session when it is still valid
+        client.load_settings(INSTAGRAM_SESSION_PATH)
+    client.login(Password.insta_user, Password.insta_pass)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    client.dump_settings(INSTAGRAM_SESSION_PATH)
+    os.chmod(INSTAGRAM_SESSION_PATH, 0o600)
+    return client
+
+def build_twitter_client():
+    import tweepy
+    return tweepy.Client(
+        consumer_key=Password.twitter_consumer_key,
+        consumer_secret=Password.twitter_consumer_secret,
+        access_token=Password.twitter_access_token,
+        access_token_secret=Password.twitter_access_token_secret
+    )
+
+# provider -> (build, validate); validate raises when the session is no longer usable
+CLIENT_PROVIDERS = {
+    "instagram": (build_instagram_client, lambda client: client.get_timeline_feed()),
+    "twitter": (build_twitter_client, lambda client: client.get_me(user_auth=True)),
+}
+
+class ClientRegistry:
+    def __init__(self, providers=CLIENT_PROVIDERS, revalidate_after=CLIENT_REVALIDATE_SECONDS, clock=time.monotonic):
+        self.providers = providers
+        self.revalidate_after = revalidate_after
+        self.clock = clock
+        self.clients = {}  # provider -> (client, last validated)
+        self.counters = {name: {"logins": 0, "reuses": 0, "revalidations": 0, "login_seconds": 0.0} for name in providers}
+        # One lock per provider: a slow Instagram login must not block Twitter
+        # callers, while concurrent callers of one provider still share one login
+        self.locks = {name: threading.Lock() for name in providers}
+
+    def get(self, provider):
+        build, validate = self.providers[provider]
+        counters = self.counters[provider]
+        with self.locks[provider]:
+            entry = self.clients.pop(provider, None)
+            if entry and self.clock() - entry[1] > self.revalidate_after:
+                counters["revalidations"] += 1
+                try:
+                    validate(entry[0])
+                    entry = (entry[0], self.clock())
+                except Exception:
+                    entry = None
+            if entry:
+                counters["reuses"] += 1
+            else:
+                start = time.perf_counter()
+                entry = (build(), self.clock())
+                counters["logins"] += 1
+                counters["login_seconds"] += time.perf_counter() - start
+            self.clients[provider] = entry
+            return entry[0]
+
+    def invalidate(self, provider):
+        # Call after an authentication error so the next get() logs in again
+        with self.locks[provider]:
+            self.clients.pop(provider, None)
+
+    def stats(self):
+        rows = []
+        for name, counters in self.counters.items():
+            calls = counters["logins"] + counters["reuses"]
+            rows.append({
+                "Provider": name,
+                "Logins": counters["logins"],
+                "Reuses": counters["reuses"],
+                "Reuse rate": f"{counters['reuses'] / calls:.0%}" if calls else "–",
+                "Avg login (s)": round(counters["login_seconds"] / counters["logins"], 2) if counters["logins"] else None,
+                "Revalidations": counters["revalidations"],
+            })
+        return rows
+
+@st.cache_resource(show_spinner=False)
+def get_client_registry():
+    return ClientRegistry()
+
+# ✉️ SMTP Sessions
+# One authenticated SMTP connection is reused for a whole batch instead of a
+# connect/STARTTLS/login/quit round trip per message. A dropped connection
+# (server idle timeout, per-session message cap) is re-opened and the
+# message resent once, without the caller noticing.
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 587
+SMTP_TIMEOUT = 30
+SMTP_RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+class SMTPSession:
+    def __init__(self, user, password, host=SMTP_HOST, port=SMTP_PORT, factory=smtplib.SMTP):
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+        self.factory = factory
+        self.server = None
+        self.lock = threading.Lock()
+        self.stats = {"sent": 0, "connects": 0, "reconnects": 0, "bytes": 0, "connect_seconds": 0.0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send(self, message):
+        # Thread-safe; SMTP is a strictly request/response protocol, so
+        # concurrent callers are serialised on the one connection
+        with self.lock:
+            if self.server is None:
+                self._connect()
+            try:
+                self.server.send_message(message)
+            except SMTP_RECONNECT_ERRORS:
+                self.stats["reconnects"] += 1
+                self._connect()
+                self.server.send_message(message)
+            self.stats["sent"] += 1
+            self.stats["bytes"] += len(message.as_bytes())
+
+    def close(self):
+        with self.lock:
+            if self.server is not None:
+                try:
+                    self.server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self.server = None
+
+    def _connect(self):
+        if self.server is not None:
+            try:
+                self.server.close()
+            except OSError:
+                pass
+        start = time.perf_counter()
+        server = self.factory(self.host, self.port, timeout=SMTP_TIMEOUT)
+        server.starttls()
+        server.login(self.user, self.password)
+        self.server = server
+        self.stats["connects"] += 1
+        self.stats["connect_seconds"] += time.perf_counter() - start
+
+def build_email(sender, to, subject, body, html=None):
+    # Proper MIME: encoded UTF-8 headers and body, multipart/alternative when
+    # an HTML part is given
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = to
+    message["Subject"] = subject
+    message["Message-ID"] = make_msgid()
+    message.set_content(body)
+    if html:
+        message.add_alternative(html, subtype="html")
+    return message
+
+# Only {column} placeholders are substituted; other braces (CSS rules,
+# {name.attr}, JSON snippets) are left as written
+MERGE_FIELD = re.compile(r"\{(\w+)\}")
+
+def render_merge(template, row):
+    def field(match):
+        if match.group(1) not in row:
+            raise ValueError(f"no column named '{match.group(1)}' in the CSV")
+        return row[match.group(1)] or ""
+    return MERGE_FIELD.sub(field, template)
+
+def parse_merge_csv(data):
+    # Returns [(CSV line, row)] for rows with an email address
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+    rows = []
+    for row in reader:
+        if row.get("email"):
+            rows.append((reader.line_num, row))
+    return rows
+
+def mail_merge(session, rows, subject_template, body_template, html_template=None, progress=None):
+    # Sends one personalised message per (line, row) over a single session;
+    # a row that fails is reported by its CSV line and the batch continues
+    summary = {"sent": 0, "failed": 0, "failures": []}
+    start = time.perf_counter()
+    for i, (line, row) in enumerate(rows):
+        try:
+            # Any rendering or MIME problem is confined to its row
+            message = build_email(
+                session.user, row["email"], render_merge(subject_template, row), render_merge(body_template, row),
+                render_merge(html_template, row) if html_template else None
+            )
+        except Exception as e:
+            error = e
+        else:
+            try:
+                session.send(message)
+                summary["sent"] += 1
+                error = None
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+                # Per-message SMTP problems only; connection or login failures stop the batch
+                error = e
+        if error:
+            summary["failed"] += 1
+            summary["failures"].append({"Row": line, "Email": row.get("email", ""), "Error": str(error)})
+        if progress:
+            progress((i + 1) / len(rows), f"{i + 1} of {len(rows)} processed")
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    summary["per_second"] = round(summary["sent"] / summary["seconds"], 2) if summary["seconds"] else 0.0
+    summary.update({key: session.stats[key] for key in ("connects", "reconnects", "bytes")})
+    return summary
+
+def mail_merge_job(job, rows, subject_template, body_template, html_template):
+    with SMTPSession(Password.email, Password.mail_pass) as session:
+        return mail_merge(session, rows, subject_template, body_template, html_template, progress=job.progress)
+
+# 📤 Bulk Messaging
+# Sends a CSV of tweets, emails or SMS through a token bucket per provider,
+# so any number of workers together stay under the provider's rate limit.
+# Each item is retried with backoff, and outcomes are appended to a
+# checkpoint log so an interrupted campaign resumes where it stopped.
+BULK_WORKERS = 4
+BULK_MAX_RETRIES = 3
+BULK_RETRY_BASE = 1.0
+BULK_CHECKPOINT_DIR = os.path.join(CACHE_DIR, "bulk")
+# rate (messages per second), burst, required CSV columns, modules to load
+BULK_PROVIDERS = {
+    "Twitter": {"rate": 200 / 900, "burst": 5, "columns": ["text"], "modules": ["tweepy"]},
+    "Email": {"rate": 1.0, "burst": 5, "columns": ["to", "subject", "body"], "modules": []},
+    "Twilio SMS": {"rate": 1.0, "burst": 1, "columns": ["to", "body"], "modules": ["twilio.rest"]},
+}
+
+class TokenBucket:
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Blocks until a token is available; safe to call from many threads
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # Tolerance: refilling by wait * rate can land a hair under 1,
+                # and a float-sized follow-up sleep may not advance the clock
+                if self.tokens >= 1 - 1e-9:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+@st.cache_resource(show_spinner=False)
+def get_rate_limiter(provider):
+    # One bucket per provider per process, shared by every session and job
+    return TokenBucket(BULK_PROVIDERS[provider]["rate"], BULK_PROVIDERS[provider]["burst"])
+
+class BulkCheckpoint:
+    # Append-only JSON lines of {"key", "status", "detail"}; the last line for
+    # a key wins, so a crash loses at most the line being written
+    def __init__(self, path):
+        self.path = path
+        self.sent = {}
+        self.failed = {}
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line
+                    self._apply(entry)
+
+    def record(self, key, status, detail):
+        entry = {"key": key, "status": status, "detail": detail}
+        with self.lock:
+            self._apply(entry)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def reset(self):
+        with self.lock:
+            self.sent.clear()
+            self.failed.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _apply(self, entry):
+        if entry["status"] == "sent":
+            self.sent[entry["key"]] = entry["detail"]
+            self.failed.pop(entry["key"], None)
+        else:
+            self.failed[entry["key"]] = entry["detail"]
+
+def parse_bulk_csv(data, columns):
+    # Returns [(key, row)] where key identifies the row across resumes
+    reader = csv.DictReader(io.StringIO(data.decode("utf-8-sig")))
+    missing = [c for c in columns if c not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+    items = []
+    for row in reader:
+        # line_num, not a record count: DictReader skips blank lines and
+        # quoted fields may span lines
+        line = reader.line_num
+        row = {c: (row[c] or "").strip() for c in columns}
+        if not any(row.values()):
+            continue
+        digest = hashlib.sha1(json.dumps(row, sort_keys=True).encode()).hexdigest()[:10]
+        items.append((f"{line}:{digest}", row))
+    return items
+
+def bulk_checkpoint_for(provider, data):
+    campaign = hashlib.sha256(provider.encode() + b"\0" + data).hexdigest()[:16]
+    return BulkCheckpoint(os.path.join(BULK_CHECKPOINT_DIR, f"{campaign}.jsonl"))
+
+@contextmanager
+def bulk_sender(provider):
+    # Yields send(row) -> provider message id (raises on failure) and
+    # releases any connection it opened once the campaign is over
+    if provider == "Twitter":
+        client = get_client_registry().get("twitter")
+        yield lambda row: client.create_tweet(text=row["text"]).data["id"]
+    elif provider == "Twilio SMS":
+        from twilio.rest import Client as TwilioClient
+        client = TwilioClient(Password.twilio_sid, Password.twilio_auth_token)
+        yield lambda row: client.messages.create(from_=Password.twilio_number, body=row["body"], to=row["to"]).sid
+    else:
+        # Workers share one SMTP session; the token bucket, not the connection,
+        # is what limits email throughput
+        with SMTPSession(Password.email, Password.mail_pass) as session:
+            def send_email(row):
+                session.send(build_email(Password.email, row["to"], row["subject"], row["body"]))
+                return row["to"]
+            yield send_email
+
+def send_bulk(items, send, limiter, checkpoint, max_workers=BULK_WORKERS, retries=BULK_MAX_RETRIES, progress=None, sleep=time.sleep):
+    # Rows already sent in an earlier run are skipped; failed rows are retried
+    pending = [(key, row) for key, row in items if key not in checkpoint.sent]
+    summary = {"total": len(items), "skipped": len(items) - len(pending), "sent": 0, "failed": 0, "attempts": 0}
+
+    def deliver(entry):
+        key, row = entry
+        attempts = 0
+        for attempt in range(retries + 1):
+            limiter.acquire()
+            attempts += 1
+            try:
+                return key, "sent", str(send(row)), attempts
+            except Exception as e:
+                error = str(e)
+                # Permanent errors (duplicate tweet, invalid number) fail at once
+                # instead of burning rate-limit tokens on retries
+                if not is_retryable(e):
+                    break
+                if attempt < retries:
+                    sleep(BULK_RETRY_BASE * 2 ** attempt * random.uniform(0.5, 1.5))
+        return key, "failed", error, attempts
+
+    start = time.perf_counter()
+    for done, (_, (key, status, detail, attempts)) in enumerate(run_concurrently(deliver, pending, max_workers=max_workers), 1):
+        checkpoint.record(key, status, detail)
+        summary[status] += 1
+        summary["attempts"] += attempts
+        if progress:
+            progress(done / len(pending), f"{done} of {len(pending)} sent or failed")
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    summary["failures"] = [{"Row": key.split(":")[0], "Error": error} for key, error in checkpoint.failed.items()]
+    return summary
+
+def bulk_job(job, provider, items, checkpoint_path, max_workers):
+    with bulk_sender(provider) as send:
+        return send_bulk(items, send, get_rate_limiter(provider), BulkCheckpoint(checkpoint_path), max_workers, progress=job.progress)
 
 # === Tool Pages ===
 
@@ -232,76 +2250,194 @@ if page == "🏠 Home":
 
 elif page == "📄 PDF Summarizer":
     st.title("📄 PDF Summarizer (Gemini)")
+    import requests
+    from pypdf import PdfReader
+    from langchain_community.document_loaders import PyPDFLoader
     url = st.text_input("Paste PDF URL:")
-    pages_to_analyze = st.slider("Pages to analyze", 1, 20, 5)
-
-    def read_pdf_pages(pdf_url, max_pages):
-        r = requests.get(pdf_url)
+    pages_to_analyze = st.slider("Pages to analyze", 1, 500, 5)
+    max_parallel = st.slider("Parallel Gemini requests", 1, 10, 4)
+    chunk_tokens = st.slider("Chunk size (tokens)", 250, 8000, SUMMARY_CHUNK_TOKENS, step=250)
+    fan_out = st.slider("Summaries merged per reduce step", 2, 20, SUMMARY_FAN_OUT)
+    max_download_mb = st.number_input("Max download size (MB)", min_value=1, max_value=1000, value=PDF_MAX_DOWNLOAD_MB)
+    run_in_background = st.checkbox("🗂 Run in background")
+
+    def read_pdf_pages(pdf_url, max_pages, max_bytes):
+        # Stream the download to disk in chunks (aborting past max_bytes) and
+        # parse only the first max_pages pages. A PDF's page table sits at the
+        # end of the file, so the whole file is still needed before parsing.
+        stats = {"downloaded_bytes": 0, "total_pages": 0, "skipped_pages": 0}
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as f:
-            f.write(r.content)
-            loader = PyPDFLoader(f.name)
-            pages = loader.load()
-        os.remove(f.name)
-        return pages[:max_pages]
+            tmp_path = f.name
+        # Removed on every path, including a reset or timeout mid-download
+        try:
+            with requests.get(pdf_url, stream=True, timeout=30) as r:
+                r.raise_for_status()
+                declared = int(r.headers.get("Content-Length") or 0)
+                if declared > max_bytes:
+                    raise ValueError(f"PDF is {declared / 1e6:.1f} MB, above the {max_bytes / 1e6:.0f} MB limit; skipped all {declared} bytes.")
+                with open(tmp_path, "wb") as f:
+                    for chunk in r.iter_content(chunk_size=PDF_CHUNK_SIZE):
+                        stats["downloaded_bytes"] += len(chunk)
+                        if stats["downloaded_bytes"] > max_bytes:
+                            break
+                        f.write(chunk)
+            if stats["downloaded_bytes"] > max_bytes:
+                raise ValueError(f"Download stopped at the {max_bytes / 1e6:.0f} MB limit; the rest of the file was skipped.")
+            stats["total_pages"] = len(PdfReader(tmp_path).pages)
+            pages = list(itertools.islice(PyPDFLoader(tmp_path).lazy_load(), max_pages))
+        finally:
+            os.remove(tmp_path)
+        stats["skipped_pages"] = stats["total_pages"] - len(pages)
+        return pages, stats
 
-    def safe_generate(text, is_final_summary=False):
-        prompt = (
-            'Summarize the objective, methods, and key findings from the following text:\n\n'
-            if is_final_summary else
-            'Summarize the following page content into 3–5 concise bullet points:\n\n'
-        ) + text[:2000]
+    def safe_generate(text, kind="page"):
+        prompt = SUMMARY_PROMPTS[kind] + text[:SUMMARY_MAX_INPUT_CHARS]
 
-        for attempt in range(MAX_RETRIES):
-            try:
-                response = llm.invoke([HumanMessage(content=prompt)])
-                return response.content
-            except Exception as e:
-                if "stream has ended" in str(e).lower() and attempt < MAX_RETRIES - 1:
-                    time.sleep(2)
-                    continue
-                st.error(f"Error generating summary: {e}")
-                return "❌ Failed to generate summary."
-        return "❌ Failed after multiple retries."
+        # The model router handles retries, backoff and fallback
+        try:
+            return llm_invoke(prompt, task="reasoning" if kind == "final" else "summary")
+        except Exception as e:
+            # Runs on worker threads, so report the error in the returned text
+            return f"❌ Failed to generate summary: {e}"
+
+    def generate_all(texts, kind):
+        results = [None] * len(texts)
+        for i, summary in run_concurrently(lambda t: safe_generate(t, kind), texts, max_workers=max_parallel):
+            results[i] = summary
+        return results
+
+    def reduce_summaries(summaries):
+        # Tree reduction: every round merges groups of fan_out summaries in
+        # parallel, so n summaries need about log_fan_out(n) sequential rounds.
+        # Returns the text for the final call, which the caller streams.
+        rounds = 0
+        while len(summaries) > fan_out:
+            groups = ["\n\n".join(summaries[i:i + fan_out]) for i in range(0, len(summaries), fan_out)]
+            summaries = generate_all(groups, "combine")
+            rounds += 1
+        return "\n\n".join(summaries), rounds + 1
+
+    def stream_generate(text, kind):
+        # Streams into the page, so only call this from the script thread
+        try:
+            return st.write_stream(llm_stream(SUMMARY_PROMPTS[kind] + text[:SUMMARY_MAX_INPUT_CHARS], task="reasoning"))
+        except Exception as e:
+            st.error(f"Error generating summary: {e}")
+            return "❌ Failed to generate summary."
+
+    def summarize_pdf(pdf_url, max_pages, max_bytes, on_pages=None, on_page=None, finalize=None, progress=None):
+        # The whole pipeline, shared by the page and the background job.
+        # Callbacks run on the calling thread:
+        #   on_pages(count, ingest_stats) once the PDF is parsed
+        #   on_page(i, summary) as each page summary is ready
+        #   finalize(reduced, stats) -> overall summary (default: one LLM call)
+        #   progress(fraction, message)
+        # Returns (sections, stats).
+        report = progress or (lambda fraction, message: None)
+        report(0.0, "Downloading PDF")
+        extracted_pages, ingest_stats = read_pdf_pages(pdf_url, max_pages, max_bytes)
+        page_texts = [p.page_content for p in extracted_pages]
+        if on_pages:
+            on_pages(len(page_texts), ingest_stats)
+
+        # Map: split every page to the token budget and summarize all
+        # chunks of all pages in one parallel pass
+        chunks = [(i, c) for i, text in enumerate(page_texts) for c in chunk_text(text, chunk_tokens * CHARS_PER_TOKEN)]
+        chunk_summaries = [[] for _ in page_texts]
+        pending = [0] * len(page_texts)
+        for i, _ in chunks:
+            pending[i] += 1
+        summaries = [None] * len(page_texts)
+        start = time.perf_counter()
+        for done, (n, summary) in enumerate(run_concurrently(lambda item: safe_generate(item[1]), chunks, max_workers=max_parallel), 1):
+            i = chunks[n][0]
+            chunk_summaries[i].append((n, summary))
+            pending[i] -= 1
+            if pending[i] == 0 and len(chunk_summaries[i]) == 1:
+                summaries[i] = summary
+                if on_page:
+                    on_page(i, summary)
+            report(0.8 * done / len(chunks), f"Summarized {done} of {len(chunks)} chunks")
+
+        # Pages longer than one chunk get their chunk summaries merged
+        long_pages = [i for i, parts in enumerate(chunk_summaries) if len(parts) > 1]
+        if long_pages:
+            report(0.85, f"Merging {len(long_pages)} long page(s)")
+        merged = generate_all(["\n\n".join(s for _, s in sorted(chunk_summaries[i])) for i in long_pages], "page")
+        for i, summary in zip(long_pages, merged):
+            summaries[i] = summary
+            if on_page:
+                on_page(i, summary)
+        stats = {"pages": len(page_texts), "chunks": len(chunks), "map_seconds": time.perf_counter() - start, "rounds": 0}
+        sections = [(f"📄 Page {i+1}", summary) for i, summary in enumerate(summaries)]
+
+        if summaries:
+            # Reduce: the overall summary is built from every page summary
+            report(0.9, "Writing overall summary")
+            reduced, stats["rounds"] = reduce_summaries(summaries)
+            final_summary = finalize(reduced, stats) if finalize else safe_generate(reduced, "final")
+            sections.append(("🧠 Overall Summary", final_summary))
+        return sections, stats
+
+    def summarize_job(job, pdf_url, max_pages, max_bytes):
+        sections, _ = summarize_pdf(pdf_url, max_pages, max_bytes, progress=job.progress)
+        return {"url": pdf_url, "sections": sections}
 
     if st.button("Summarize"):
         if not url:
             st.warning("Please enter a PDF URL.")
+        elif run_in_background:
+            submit_job("pdf_summary", f"Summarize {url[:60]}", summarize_job, url, pages_to_analyze, int(max_download_mb * 1e6))
         else:
+            placeholders = []
+
+            def show_pages(count, ingest_stats):
+                st.caption(
+                    f"Downloaded {ingest_stats['downloaded_bytes'] / 1e6:.2f} MB; parsed {count} "
+                    f"of {ingest_stats['total_pages']} pages ({ingest_stats['skipped_pages']} skipped)."
+                )
+                # One placeholder per page keeps the output in page order
+                # while summaries arrive in completion order.
+                for i in range(count):
+                    st.subheader(f"📄 Page {i+1} Summary")
+                    placeholders.append(st.empty())
+                    placeholders[i].caption("⏳ Summarizing...")
+
+            def stream_final(reduced, stats):
+                st.caption(f"Summarized {stats['pages']} pages ({stats['chunks']} chunks) in {stats['map_seconds']:.1f}s with up to {max_parallel} parallel requests.")
+                st.subheader("🧠 Overall Document Summary")
+                st.caption(f"Reduced {stats['pages']} page summaries in {stats['rounds']} sequential round(s).")
+                return stream_generate(reduced, "final")
+
             try:
                 with st.spinner("Processing PDF..."):
-                    extracted_pages = read_pdf_pages(url, pages_to_analyze)
-                    all_text = ""
-                    output_lines = []
-                    for i, p in enumerate(extracted_pages):
-                        page_text = p.page_content
-                        all_text += page_text + "\n\n"
-                        summary = safe_generate(page_text)
-                        st.subheader(f"📄 Page {i+1} Summary")
-                        st.markdown(summary)
-                        output_lines.append(f"📄 Page {i+1}:\n{summary}\n")
-
-                    if extracted_pages:
-                        final_summary = safe_generate(all_text, is_final_summary=True)
-                        st.subheader("🧠 Overall Document Summary")
-                        st.markdown(final_summary)
-                        output_lines.append("🧠 Overall Summary:\n" + final_summary)
-                        full_content = "\n".join(output_lines)
-                        
-                        txt_path = save_txt(full_content)
-                        with open(txt_path, "rb") as f:
-                            st.download_button("📥 Download TXT Summary", f, file_name="summary.txt")
-                        
-                        pdf_path = save_pdf(full_content)
-                        with open(pdf_path, "rb") as f:
-                            st.download_button("📥 Download PDF Summary", f, file_name="summary.pdf")
+                    sections, _ = summarize_pdf(
+                        url, pages_to_analyze, int(max_download_mb * 1e6), on_pages=show_pages,
+                        on_page=lambda i, summary: placeholders[i].markdown(summary), finalize=stream_final
+                    )
+                    if sections:
+                        st.markdown("**Download summary**")
+                        download_buttons("PDF Summary", sections, "summary")
 
             except Exception as e:
                 st.error(f"❌ An error occurred: {e}")
 
+    with st.expander("⏱ Export Benchmark"):
+        bench_pages = st.number_input("Summary pages", min_value=10, max_value=5000, value=500, step=50)
+        if st.button("Run Export Benchmark"):
+            with st.spinner("Rendering every export format..."):
+                st.table(benchmark_exports(int(bench_pages)))
+
 elif page == "🐧 Remote Linux":
     st.title("🐧 Remote Linux Shell")
     user = st.text_input("Enter SSH Username")
-    ip = st.text_input("Enter Remote IP Address")
+    multi_host = st.checkbox("🖧 Multi-host mode (run on many hosts at once)")
+    if multi_host:
+        hosts, max_workers, host_timeout = multi_host_inputs()
+        run_in_background = st.checkbox("🗂 Run in background")
+        ip = ""
+    else:
+        ip = st.text_input("Enter Remote IP Address")
     if "linux_path" not in st.session_state:
         st.session_state.linux_path = "~"
 
@@ -312,13 +2448,16 @@ elif page == "🐧 Remote Linux":
         "Create Directory", "Create File", "Edit File", "Read File",
         "Remove File", "Remove Directory"
     ]
+    if multi_host:
+        # Interactive operations only make sense against a single host
+        options = [o for o in options if o not in ("Change Directory", "Edit File")]
     choice = st.selectbox("Choose Operation", options)
     extra_input = ""
     if choice in ["Change Directory", "Create Directory", "Edit File", "Create File", "Remove File", "Read File", "Remove Directory"]:
         extra_input = st.text_input("Enter Name/Path:")
 
     if st.button("Execute"):
-        if not user or not ip:
+        if not user or not (hosts if multi_host else ip):
             st.warning("Please provide SSH username and IP address.")
         else:
             current_path = st.session_state.linux_path
@@ -347,7 +2486,14 @@ elif page == "🐧 Remote Linux":
             elif choice == "Remove Directory":
                 command = f"cd {current_path} && rmdir {extra_input}"
 
-            if command:
+            if command and multi_host and run_in_background:
+                submit_job("ssh", f"{command[:60]} on {len(hosts)} host(s)", ssh_job, user, hosts, command, max_workers, host_timeout)
+            elif command and multi_host:
+                with st.spinner(f"Executing on {len(hosts)} host(s): {command}"):
+                    start = time.perf_counter()
+                    rows = run_on_hosts(user, hosts, command, max_workers, host_timeout)
+                show_host_results(rows, time.perf_counter() - start)
+            elif command:
                 with st.spinner(f"Executing: {command}"):
                     output = run_ssh_command(user, ip, command)
                     st.text_area("📤 Command Output:", output, height=300)
@@ -365,24 +2511,31 @@ elif page == "🐧 Remote Linux":
                 tmp.write(data)
                 tmp_path = tmp.name
             
-            scp_cmd = f"scp {tmp_path} {user}@{ip}:{file_path}"
             with st.spinner("Uploading file..."):
-                result = subprocess.run(scp_cmd, shell=True, capture_output=True, text=True)
+                returncode, _, stderr, _ = get_ssh_pool().copy_to(user, ip, tmp_path, file_path)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 st.success("✅ File updated successfully.")
             else:
-                st.error(f"❌ Error while uploading: {result.stderr}")
+                st.error(f"❌ Error while uploading: {stderr}")
             os.remove(tmp_path)
 
+    show_ssh_metrics()
+
 elif page == "🐳 Docker Manager":
     st.title("🐳 Docker Control Panel")
     user = st.text_input("Enter SSH Username")
-    ip = st.text_input("Enter Remote IP Address")
+    multi_host = st.checkbox("🖧 Multi-host mode (run on many hosts at once)")
+    if multi_host:
+        hosts, max_workers, host_timeout = multi_host_inputs()
+        run_in_background = st.checkbox("🗂 Run in background")
+        ip = ""
+    else:
+        ip = st.text_input("Enter Remote IP Address")
     
     docker_options = [
         "List All Containers", "List Images", "Pull Image", "Launch New Container", 
-        "Start Container", "Stop Container", "Remove Container"
+        "Start Container", "Stop Container", "Remove Container", "Structured Inventory"
     ]
     choice = st.selectbox("Choose Docker Operation", docker_options)
     
@@ -390,7 +2543,7 @@ elif page == "🐳 Docker Manager":
     image = st.text_input("Image Name (for launching a new container)")
     
     if st.button("Execute Docker Command"):
-        if not user or not ip:
+        if not user or not (hosts if multi_host else ip):
             st.warning("Please provide SSH username and IP address.")
         else:
             command = ""
@@ -415,57 +2568,135 @@ elif page == "🐳 Docker Manager":
                 else:
                     command = f"docker pull {name}"
             
-            if command:
+            if command and multi_host and run_in_background:
+                submit_job("ssh", f"{command[:60]} on {len(hosts)} host(s)", ssh_job, user, hosts, command, max_workers, host_timeout)
+            elif command and multi_host:
+                with st.spinner(f"Executing on {len(hosts)} host(s): {command}"):
+                    start = time.perf_counter()
+                    rows = run_on_hosts(user, hosts, command, max_workers, host_timeout)
+                show_host_results(rows, time.perf_counter() - start)
+            elif command:
                 with st.spinner(f"Executing: {command}"):
                     output = run_ssh_command(user, ip, command)
                     st.text_area("📤 Docker Output:", output, height=300)
 
+    if choice == "Structured Inventory" and user and (hosts if multi_host else ip):
+        targets = hosts if multi_host else [ip]
+        col1, col2 = st.columns(2)
+        full = col2.button("Full Relist")
+        col1.button("Refresh")  # any rerun refreshes incrementally once the TTL has passed
+
+        def sync(host):
+            host_user, _, address = host.rpartition("@")
+            try:
+                return get_docker_inventory(host_user or user, address).refresh(full=full), None
+            except Exception as e:
+                return None, f"{address}: {e}"
+
+        containers, images, errors = [], [], []
+        with st.spinner(f"Syncing Docker inventory on {len(targets)} host(s)..."):
+            for _, (inventory, error) in run_concurrently(sync, targets, max_workers=SSH_FANOUT_WORKERS):
+                if error:
+                    errors.append(error)
+                    continue
+                containers += [{"Host": inventory.ip, **row, "ID": row["ID"][:12]} for row in inventory.containers.values()]
+                images += [{"Host": inventory.ip, **row, "ID": row["ID"].split(":")[-1][:12]} for row in inventory.images.values()]
+        for error in errors:
+            st.error(f"❌ {error}")
+        st.subheader(f"Containers ({len(containers)})")
+        st.dataframe(containers, use_container_width=True)
+        st.subheader(f"Images ({len(images)})")
+        st.dataframe(images, use_container_width=True)
+        st.caption(f"Cached for {DOCKER_INVENTORY_TTL}s per host; later refreshes replay `docker events` instead of relisting.")
+
+    show_ssh_metrics()
+
 elif page == "🌐 Website Q&A":
     st.title("🌐 Ask Questions from Any Website")
+    import requests
+    from bs4 import BeautifulSoup
     if "chat_history" not in st.session_state: st.session_state.chat_history = []
+    if "chat_memory" not in st.session_state: st.session_state.chat_memory = ChatMemory()
 
     def scrape_website(url):
         try:
             r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
             r.raise_for_status()
-            soup = BeautifulSoup(r.text, "html.parser")
-            content = "\n".join(el.get_text(strip=True) for el in soup.find_all(['h1','h2','h3','p','li','span']) if el.get_text(strip=True))
-            return content[:15000] if content else "No text content found."
+            content = extract_text(BeautifulSoup(r.text, "html.parser"))
+            return content[:WEBSITE_MAX_CHARS] if content else "No text content found."
         except requests.exceptions.RequestException as e:
             return f"❌ Error scraping website: {e}"
 
-    def website_agent(question, context, history):
+    def website_agent(question, context, history, memory):
+        # history is the full transcript shown on the page; only the bounded
+        # memory (summary + recent turns) goes into the prompt
         prompt = f"Based ONLY on the following text, answer the question. Do not use outside knowledge.\n\nCONTEXT:\n{context}\n\n---\n\nChat History:\n"
-        for msg in history:
-            prompt += f"{msg['role']}: {msg['text']}\n"
+        prompt += memory.render()
         prompt += f"user: {question}"
         
         try:
-            response = llm.invoke([HumanMessage(content=prompt)])
-            reply = response.content
+            reply = st.write_stream(llm_stream(prompt))
+            memory.record_prompt(prompt)
             history.append({"role": "user", "text": question})
             history.append({"role": "model", "text": reply})
+            memory.add("user", question)
+            memory.add("model", reply)
             return reply, history
         except Exception as e:
             return f"❌ Gemini API error: {e}", history
 
     url_input = st.text_input("🔗 Enter Website URL", value="https://www.w3schools.com/python/")
+    crawl = st.checkbox("🕸 Crawl same-domain links")
+    if crawl:
+        col1, col2, col3, col4 = st.columns(4)
+        crawl_depth = col1.number_input("Link depth", min_value=1, max_value=5, value=CRAWL_MAX_DEPTH)
+        crawl_pages = col2.number_input("Page budget", min_value=1, max_value=500, value=CRAWL_MAX_PAGES)
+        crawl_concurrency = col3.number_input("Parallel fetches", min_value=1, max_value=32, value=CRAWL_CONCURRENCY)
+        crawl_rate = col4.number_input("Requests/sec per host", min_value=1, max_value=50, value=CRAWL_HOST_RATE)
+        # Crawls get their own saved index, separate from single-page loads
+        index_key = f"{url_input}#crawl:{crawl_depth}:{crawl_pages}"
+    else:
+        index_key = url_input
+    rescrape = st.checkbox("Re-scrape even if this site is already indexed")
     if st.button("Scrape and Load Website"):
-        with st.spinner("Scraping website..."):
-            ctx = scrape_website(url_input)
-            if ctx.startswith("❌"):
-                st.error(ctx)
-            else:
-                st.session_state.scraped_context = ctx
-                st.session_state.chat_history = []
-                st.success("✅ Website content loaded!")
-
-    if "scraped_context" in st.session_state:
+        index = None if rescrape else RetrievalIndex.load(index_key)
+        if index is not None:
+            st.session_state.website_index = index
+            st.session_state.chat_history = []
+            st.session_state.chat_memory = ChatMemory()
+            st.success(f"✅ Loaded saved index for this website ({len(index.chunks)} chunks).")
+        else:
+            with st.spinner("Crawling website..." if crawl else "Scraping website..."):
+                if crawl:
+                    start = time.perf_counter()
+                    ctx, crawl_stats = crawl_website(url_input, int(crawl_depth), int(crawl_pages), int(crawl_concurrency), crawl_rate)
+                    st.caption(
+                        f"Fetched {crawl_stats['fetched']} pages in {time.perf_counter() - start:.1f}s "
+                        f"({crawl_stats['duplicates']} duplicates, {crawl_stats['skipped']} non-HTML skipped, {crawl_stats['errors']} errors)."
+                    )
+                else:
+                    ctx = scrape_website(url_input)
+                if ctx.startswith("❌"):
+                    st.error(ctx)
+                else:
+                    index = RetrievalIndex(index_key, ctx)
+                    index.save()
+                    st.session_state.website_index = index
+                    st.session_state.chat_history = []
+                    st.session_state.chat_memory = ChatMemory()
+                    st.success(f"✅ Website content loaded and indexed ({len(index.chunks)} chunks)!")
+
+    if "website_index" in st.session_state:
         question = st.text_input("💬 Ask a question about the website content")
+        top_k = st.slider("Relevant chunks per question", 1, 10, RETRIEVAL_TOP_K)
         if st.button("Get Answer") and question.strip():
-            with st.spinner("🤖 Getting answer from Gemini..."):
-                answer, st.session_state.chat_history = website_agent(question, st.session_state.scraped_context, st.session_state.chat_history)
-                st.text_area("📘 Answer", value=answer, height=200)
+            index = st.session_state.website_index
+            context = "\n\n".join(index.search(question, top_k))
+            st.markdown("**📘 Answer**")
+            answer, st.session_state.chat_history = website_agent(question, context, st.session_state.chat_history, st.session_state.chat_memory)
+            if answer.startswith("❌"):
+                st.error(answer)
+            st.caption(f"Context sent: {len(context):,} of {sum(len(c) for c in index.chunks):,} indexed characters.")
 
     with st.expander("📜 View Chat History"):
         if not st.session_state.chat_history:
@@ -473,6 +2704,18 @@ elif page == "🌐 Website Q&A":
         for msg in st.session_state.chat_history:
             st.markdown(f"**{msg['role'].capitalize()}**: {msg['text']}")
 
+    with st.expander("📏 Prompt Size per Turn"):
+        memory = st.session_state.chat_memory
+        if memory.prompt_sizes:
+            st.line_chart({
+                "Compacted history": [row["History tokens"] for row in memory.prompt_sizes],
+                "Uncompacted history": [row["Uncompacted history tokens"] for row in memory.prompt_sizes],
+            })
+            st.table(memory.prompt_sizes)
+            st.caption(f"History budget: {memory.budget} tokens (≈{CHARS_PER_TOKEN} characters per token).")
+        else:
+            st.write("No questions asked yet.")
+
 elif page == "🐍 Python Error Fixer":
     st.title("🐍 Gemini Python Error Fixer")
     code_input = st.text_area("Paste your Python code or error message here", height=300)
@@ -488,9 +2731,8 @@ CODE/ERROR:
 {code_input}
 ```
 """
-                response = llm.invoke([HumanMessage(content=error_prompt)])
                 st.success("✅ Gemini's Suggestion:")
-                st.markdown(response.content)
+                st.write_stream(llm_stream(error_prompt, task="reasoning"))
             except Exception as e:
                 st.error(f"❌ An error occurred with the Gemini API: {e}")
 
@@ -515,7 +2757,8 @@ elif page == "📘 Blog Explorer":
 
 elif page == "📱 Social & Comms":
     st.title("📱 Social Media & Communications")
-    task = st.selectbox("Choose a task", ["WhatsApp Message", "Email", "Instagram Post", "Twitter Post", "LinkedIn Post (Automated)", "Twilio SMS", "Twilio Call"])
+    task = st.selectbox("Choose a task", ["WhatsApp Message", "Email", "Instagram Post", "Twitter Post", "LinkedIn Post (Automated)", "Twilio SMS", "Twilio Call", "Bulk Messaging"])
+    require(tuple(TASK_MODULES[task]))
 
     if task == "WhatsApp Message":
         st.subheader("WhatsApp Message Sender")
@@ -524,25 +2767,65 @@ elif page == "📱 Social & Comms":
         hour = st.number_input("Hour (24-hour format)", min_value=0, max_value=23, step=1)
         minute = st.number_input("Minute", min_value=0, max_value=59, step=1)
         if st.button("Send WhatsApp Message"):
+            import pywhatkit
             pywhatkit.sendwhatmsg(mob, msg, int(hour), int(minute))
             st.success("WhatsApp message scheduled!")
 
     elif task == "Email":
-        st.subheader("Send an Email")
-        rec = st.text_input("Enter Receiver's E-Mail")
-        sub = st.text_input("Enter Subject")
-        body = st.text_area("Enter Body Content")
-        if st.button("Send Email"):
-            message = f"Subject: {sub}\n\n{body}"
-            try:
-                server = smtplib.SMTP("smtp.gmail.com", 587)
-                server.starttls()
-                server.login(Password.email, Password.mail_pass)
-                server.sendmail(Password.email, rec, message)
-                server.quit()
-                st.success("Email sent successfully!")
-            except Exception as e:
-                st.error(f"Failed to send email: {e}")
+        mode = st.radio("Mode", ["Single Email", "Mail Merge"], horizontal=True)
+        if mode == "Single Email":
+            st.subheader("Send an Email")
+            rec = st.text_input("Enter Receiver's E-Mail")
+            sub = st.text_input("Enter Subject")
+            body = st.text_area("Enter Body Content")
+            if st.button("Send Email"):
+                try:
+                    with SMTPSession(Password.email, Password.mail_pass) as session:
+                        session.send(build_email(Password.email, rec, sub, body))
+                    st.success("Email sent successfully!")
+                except Exception as e:
+                    st.error(f"Failed to send email: {e}")
+        else:
+            st.subheader("Mail Merge")
+            st.caption("Upload a CSV with an `email` column; use `{column}` placeholders in the templates.")
+            uploaded = st.file_uploader("Recipients CSV", type=["csv"])
+            sub = st.text_input("Subject template", "Hello {name}")
+            body = st.text_area("Body template", "Hi {name},\n\n")
+            html = st.text_area("HTML template (optional)", "")
+            run_in_background = st.checkbox("🗂 Run in background")
+            if uploaded is not None:
+                rows = parse_merge_csv(uploaded.getvalue())
+                if not rows:
+                    st.warning("No rows with an `email` value found.")
+                else:
+                    with st.expander(f"Preview ({len(rows)} recipient(s))"):
+                        try:
+                            _, first = rows[0]
+                            preview = build_email(Password.email, first["email"], render_merge(sub, first), render_merge(body, first),
+                                                  render_merge(html, first) if html else None)
+                            st.code(preview.as_string(), language="text")
+                        except Exception as e:
+                            st.error(f"❌ {e}")
+                    if st.button("Send Mail Merge"):
+                        if run_in_background:
+                            submit_job("mail_merge", f"Mail merge to {len(rows)} recipient(s)", mail_merge_job, rows, sub, body, html or None)
+                        else:
+                            bar = st.progress(0.0)
+                            try:
+                                with SMTPSession(Password.email, Password.mail_pass) as session:
+                                    summary = mail_merge(session, rows, sub, body, html or None,
+                                                         progress=lambda fraction, message: bar.progress(fraction, text=message))
+                            except Exception as e:
+                                st.error(f"❌ Mail merge stopped: {e}")
+                                st.stop()
+                            col1, col2, col3, col4 = st.columns(4)
+                            col1.metric("Sent", summary["sent"])
+                            col2.metric("Failed", summary["failed"])
+                            col3.metric("Messages/s", summary["per_second"])
+                            col4.metric("Connections", f"{summary['connects']} ({summary['reconnects']} reconnects)")
+                            st.caption(f"{summary['bytes'] / 1e6:.2f} MB in {summary['seconds']}s over one SMTP session per batch.")
+                            if summary["failures"]:
+                                st.dataframe(summary["failures"], use_container_width=True)
 
     elif task == "Instagram Post":
         st.subheader("Instagram Photo Uploader")
@@ -555,9 +2838,14 @@ elif page == "📱 Social & Comms":
                     image_path = tmp.name
                 
                 try:
-                    cl = InstaClient()
-                    cl.login("YOUR_INSTA_USERNAME", Password.insta_pass)
-                    cl.photo_upload(path=image_path, caption=caption)
+                    from instagrapi.exceptions import LoginRequired
+                    cl = get_client_registry().get("instagram")
+                    try:
+                        cl.photo_upload(path=image_path, caption=caption)
+                    except LoginRequired:
+                        # The saved session expired server-side; log in again once
+                        get_client_registry().invalidate("instagram")
+                        get_client_registry().get("instagram").photo_upload(path=image_path, caption=caption)
                     st.success("Photo uploaded to Instagram successfully!")
                 except Exception as e:
                     st.error(f"Failed to upload to Instagram: {e}")
@@ -570,37 +2858,68 @@ elif page == "📱 Social & Comms":
         st.subheader("Twitter Bulk Tweet Poster")
         n = st.number_input("How many tweets?", min_value=1, max_value=10, step=1)
         tweets = [st.text_input(f"Tweet #{i+1}:") for i in range(n)]
+        run_in_background = st.checkbox("🗂 Run in background")
+
+        def post_tweets_job(job, texts):
+            client = get_client_registry().get("twitter")
+            posted = []
+            for i, tweet in enumerate(texts):
+                job.progress(i / len(texts), f"Posting tweet {i+1} of {len(texts)}")
+                response = client.create_tweet(text=tweet)
+                posted.append({"Tweet": tweet, "ID": response.data["id"]})
+            return posted
+
         if st.button("Post Tweets"):
-            try:
-                client = tweepy.Client(
-                    consumer_key=Password.twitter_consumer_key,
-                    consumer_secret=Password.twitter_consumer_secret,
-                    access_token=Password.twitter_access_token,
-                    access_token_secret=Password.twitter_access_token_secret
-                )
-                for i, tweet in enumerate(tweets):
-                    if tweet.strip():
-                        client.create_tweet(text=tweet)
-                        st.success(f"Tweet #{i+1} posted.")
-            except Exception as e:
-                st.error(f"Failed to post tweets: {e}")
+            texts = [tweet for tweet in tweets if tweet.strip()]
+            if run_in_background:
+                submit_job("twitter", f"Post {len(texts)} tweet(s)", post_tweets_job, texts)
+            else:
+                try:
+                    client = get_client_registry().get("twitter")
+                    for i, tweet in enumerate(tweets):
+                        if tweet.strip():
+                            client.create_tweet(text=tweet)
+                            st.success(f"Tweet #{i+1} posted.")
+                except Exception as e:
+                    st.error(f"Failed to post tweets: {e}")
 
     elif task == "LinkedIn Post (Automated)":
         st.subheader("LinkedIn Auto Poster (via PyAutoGUI)")
         st.warning("This is an automation script. Please ensure the LinkedIn window is ready and do not move your mouse during execution.")
         message = st.text_area("Enter your LinkedIn post message:", "Hello LinkedIn! 🚀")
+        run_in_background = st.checkbox("🗂 Run in background")
+
+        def linkedin_job(job, text):
+            # job.sleep returns control to the user: a cancel during any
+            # wait stops the automation before the next click
+            import pyautogui
+            job.progress(0.0, "Starting automation in 5 seconds")
+            job.sleep(5)
+            pyautogui.click(x=581, y=127) # Click on 'Start a post'
+            job.progress(0.4, "Writing post")
+            job.sleep(3)
+            pyautogui.write(text, interval=0.05)
+            job.progress(0.8, "Publishing")
+            job.sleep(2)
+            pyautogui.click(x=1006, y=620) # Click on 'Post' button
+            return "Post published on LinkedIn!"
+
         if st.button("Post to LinkedIn"):
-            st.info("Starting automation in 5 seconds...")
-            time.sleep(5)
-            try:
-                pyautogui.click(x=581, y=127) # Click on 'Start a post'
-                time.sleep(3)
-                pyautogui.write(message, interval=0.05)
-                time.sleep(2)
-                pyautogui.click(x=1006, y=620) # Click on 'Post' button
-                st.success("Post published on LinkedIn!")
-            except Exception as e:
-                st.error(f"Automation failed: {e}")
+            if run_in_background:
+                submit_job("linkedin", "LinkedIn post", linkedin_job, message)
+            else:
+                st.info("Starting automation in 5 seconds...")
+                time.sleep(5)
+                try:
+                    import pyautogui
+                    pyautogui.click(x=581, y=127) # Click on 'Start a post'
+                    time.sleep(3)
+                    pyautogui.write(message, interval=0.05)
+                    time.sleep(2)
+                    pyautogui.click(x=1006, y=620) # Click on 'Post' button
+                    st.success("Post published on LinkedIn!")
+                except Exception as e:
+                    st.error(f"Automation failed: {e}")
 
     elif task == "Twilio SMS":
         st.subheader("Twilio SMS Sender")
@@ -625,9 +2944,57 @@ elif page == "📱 Social & Comms":
             except Exception as e:
                 st.error(f"Failed to make call: {e}")
 
+    elif task == "Bulk Messaging":
+        st.subheader("Bulk Tweets, Emails & SMS")
+        provider = st.selectbox("Provider", list(BULK_PROVIDERS))
+        settings = BULK_PROVIDERS[provider]
+        st.caption(
+            f"CSV columns: {', '.join(settings['columns'])}. Rate limit: {settings['rate'] * 60:.1f} per minute "
+            f"(bursts of {settings['burst']}), shared by all workers."
+        )
+        uploaded = st.file_uploader("Upload CSV", type=["csv"])
+        max_workers = st.slider("Concurrent sends", 1, 16, BULK_WORKERS)
+        start_over = st.checkbox("Ignore previous progress for this file")
+        run_in_background = st.checkbox("🗂 Run in background")
+        if uploaded is not None and st.button("Send All"):
+            data = uploaded.getvalue()
+            try:
+                items = parse_bulk_csv(data, settings["columns"])
+            except ValueError as e:
+                st.error(f"❌ {e}")
+                st.stop()
+            require(tuple(settings["modules"]))
+            checkpoint = bulk_checkpoint_for(provider, data)
+            if start_over:
+                checkpoint.reset()
+            already = sum(1 for key, _ in items if key in checkpoint.sent)
+            if already:
+                st.info(f"Resuming: {already} of {len(items)} row(s) were already sent and will be skipped.")
+            if run_in_background:
+                submit_job("bulk", f"{provider}: {len(items)} message(s)", bulk_job, provider, items, checkpoint.path, max_workers)
+            else:
+                bar = st.progress(0.0)
+                try:
+                    with bulk_sender(provider) as send:
+                        summary = send_bulk(
+                            items, send, get_rate_limiter(provider), checkpoint, max_workers,
+                            progress=lambda fraction, message: bar.progress(fraction, text=message)
+                        )
+                except Exception as e:
+                    st.error(f"❌ Bulk send stopped: {e}. Sent rows are saved; press Send All to resume.")
+                    st.stop()
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Sent", summary["sent"])
+                col2.metric("Failed", summary["failed"])
+                col3.metric("Skipped", summary["skipped"])
+                col4.metric("Per second", f"{summary['sent'] / summary['seconds']:.2f}" if summary["seconds"] else "–")
+                if summary["failures"]:
+                    st.dataframe(summary["failures"], use_container_width=True)
+
 elif page == "🤖 AI/ML Models":
     st.title("🤖 AI & Machine Learning Models")
     model_choice = st.selectbox("Choose a model", ["Code Explainer (Gemini)", "Marks Predictor"])
+    require(tuple(TASK_MODULES[model_choice]))
 
     if model_choice == "Code Explainer (Gemini)":
         st.subheader("Code Explainer Using Gemini")
@@ -636,107 +3003,199 @@ elif page == "🤖 AI/ML Models":
             if code_input.strip():
                 prompt = f"Explain this code in 4-5 simple lines, specify the programming language, and detect if it’s AI-written or human-written.\n\nCODE:\n```\n{code_input}\n```"
                 with st.spinner("Generating explanation..."):
-                    response = llm.invoke([HumanMessage(content=prompt)])
-                    st.markdown(response.content)
+                    st.write_stream(llm_stream(prompt, task="reasoning"))
             else:
                 st.warning("Please enter a code snippet.")
 
     elif model_choice == "Marks Predictor":
         st.subheader("Marks Predictor based on Study Hours")
         try:
-            if not os.path.exists("marks.csv"):
+            import pandas
+            if not os.path.exists(MARKS_CSV):
                 dummy_data = {'hrs': [1, 2, 3, 4, 5, 6, 7, 8, 9, 10], 'marks': [10, 20, 30, 40, 50, 60, 70, 80, 90, 100]}
                 df = pandas.DataFrame(dummy_data)
-                df.to_csv("marks.csv", index=False)
-                
-            data = pandas.read_csv("marks.csv")
-            x = data["hrs"].values.reshape(-1, 1)
-            y = data["marks"].values.reshape(-1, 1)
-            model = LinearRegression()
-            model.fit(x, y)
+                df.to_csv(MARKS_CSV, index=False)
+
+            model = load_marks_model()
             hours = st.number_input("Enter hours of study:", min_value=0.0, max_value=10.0, step=0.5)
             if st.button("Predict Marks"):
                 prediction = model.predict([[hours]])
-                st.success(f"Predicted Marks for {hours} hours: {prediction[0][0]:.2f}%")
+                st.success(f"Predicted Marks for {hours} hours: {prediction[0]:.2f}%")
+
+            st.caption(f"Model: marks = {model.coef:.3f} × hours + {model.intercept:.3f} (trained on {model.rows:,} rows)")
+
+            st.markdown("---")
+            st.markdown("**Batch prediction**")
+            batch_file = st.file_uploader("Upload a CSV with an 'hrs' column", type=["csv"])
+            if batch_file is not None:
+                batch = pandas.read_csv(batch_file)
+                if "hrs" not in batch.columns:
+                    st.error("The CSV needs an 'hrs' column.")
+                else:
+                    # One vectorized predict call for the whole column
+                    batch["predicted_marks"] = model.predict(batch[["hrs"]].values).round(2)
+                    st.dataframe(batch, use_container_width=True)
+                    st.download_button("📥 Download Predictions", batch.to_csv(index=False), file_name="predictions.csv")
+
+            with st.expander("⏱ Training Benchmark"):
+                bench_rows = st.number_input("Sample rows", min_value=10000, max_value=50000000, value=2000000, step=500000)
+                if st.button("Run Training Benchmark"):
+                    bench_path = os.path.join(CACHE_DIR, "marks_benchmark.csv")
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    with st.spinner(f"Writing {int(bench_rows):,} sample rows..."):
+                        write_sample_marks(bench_path, int(bench_rows))
+                    with st.spinner("Training both ways..."):
+                        st.table(compare_marks_training(bench_path))
+                    os.remove(bench_path)
         except Exception as e:
             st.error(f"Could not load or process marks.csv: {e}")
 
 elif page == "🏦 Bank Management System":
     st.title("🏦 Banking Management System (MySQL)")
     st.warning("This requires a local MySQL server with a 'bms' database and 'users' and 'transactions' tables.")
+    from mysql.connector import Error
+
+    try:
+        pool = get_bms_pool()
+    except Error as e:
+        st.error(f"MySQL connection error: {e}")
+        pool = None
 
-    def create_connection():
+    if pool:
+        created_indexes = []
         try:
-            connection = mysql.connector.connect(host="localhost", user="root", password="YOUR_MYSQL_PASSWORD", database="bms")
-            return connection
+            created_indexes = migrate_bms_schema()
+            with pool.connection() as connection:
+                menu = ["Create User", "View Users", "Deposit", "Withdraw", "View Transactions", "Bulk Upload", "Statements"]
+                choice = st.sidebar.selectbox("BMS Menu", menu)
+
+                if choice == "Create User":
+                    st.subheader("Create New User")
+                    with st.form("create_user_form"):
+                        name = st.text_input("Name")
+                        email = st.text_input("Email")
+                        balance = st.number_input("Initial Balance", min_value=0.0)
+                        if st.form_submit_button("Create"):
+                            cursor = connection.cursor()
+                            cursor.execute("INSERT INTO users (name, email, balance) VALUES (%s, %s, %s)", (name, email, balance))
+                            connection.commit()
+                            st.success(f"User {name} created successfully.")
+        
+                elif choice == "View Users":
+                    st.subheader("All Users")
+                    col1, col2, col3, col4 = st.columns(4)
+                    prefix = col1.text_input("Name or email starts with")
+                    sort = col2.selectbox("Sort by", ["id", "name", "email", "balance"])
+                    descending = col3.checkbox("Descending")
+                    page_size = col4.selectbox("Rows per page", [25, 50, 100, 200], index=1)
+                    # Prefix LIKE (not %...%) so the name/email indexes can be used
+                    where, params = (["(name LIKE %s OR email LIKE %s)"], [f"{prefix}%", f"{prefix}%"]) if prefix else ([], [])
+                    paginated_table(connection, "bms_users_page", "users", ["id", "name", "email", "balance"], sort, descending, where, params, page_size)
+
+                elif choice == "Deposit":
+                    st.subheader("Deposit Money")
+                    user_id = st.number_input("User ID", min_value=1)
+                    amount = st.number_input("Amount", min_value=0.01)
+                    if st.button("Deposit"):
+                        cursor = connection.cursor()
+                        cursor.execute("UPDATE users SET balance = balance + %s WHERE id = %s", (amount, user_id))
+                        cursor.execute("INSERT INTO transactions (user_id, type, amount) VALUES (%s, 'deposit', %s)", (user_id, amount))
+                        connection.commit()
+                        st.success(f"Deposited {amount} to user ID {user_id}")
+
+                elif choice == "Withdraw":
+                    st.subheader("Withdraw Money")
+                    user_id = st.number_input("User ID", min_value=1)
+                    amount = st.number_input("Amount", min_value=0.01)
+                    if st.button("Withdraw"):
+                        if withdraw(connection, user_id, amount):
+                            st.success(f"Withdrew {amount} from user ID {user_id}")
+                        else:
+                            st.error("Insufficient balance or user not found.")
+
+                    with st.expander("⚡ Contention Benchmark"):
+                        st.caption("Runs concurrent withdrawals against a temporary account, which is deleted afterwards.")
+                        # This page already holds one pooled connection
+                        bench_threads = st.number_input("Threads", min_value=1, max_value=max(1, pool.size - 1), value=max(1, pool.size - 1))
+                        bench_per_thread = st.number_input("Withdrawals per thread", min_value=1, max_value=10000, value=200)
+                        if st.button("Run Benchmark"):
+                            with st.spinner("Running concurrent withdrawals..."):
+                                st.table([benchmark_withdrawals(pool, int(bench_threads), int(bench_per_thread))])
+        
+                elif choice == "View Transactions":
+                    st.subheader("User Transactions")
+                    col1, col2, col3, col4 = st.columns(4)
+                    user_id = col1.number_input("User ID", min_value=1)
+                    tx_type = col2.selectbox("Type", ["All", "deposit", "withdrawal"])
+                    sort = col3.selectbox("Sort by", ["created_at", "amount"])
+                    oldest_first = col4.checkbox("Oldest / smallest first")
+                    where, params = ["user_id = %s"], [user_id]
+                    if tx_type != "All":
+                        where.append("type = %s")
+                        params.append(tx_type)
+                    paginated_table(connection, "bms_transactions_page", "transactions", ["id", "user_id", "type", "amount", "created_at"], sort, not oldest_first, where, params)
+
+                elif choice == "Bulk Upload":
+                    st.subheader("Bulk Transaction Upload")
+                    st.caption("CSV with a header row, or a JSON list of objects, with columns user_id, type (deposit/withdrawal) and amount.")
+                    uploaded = st.file_uploader("Transactions file", type=["csv", "json"])
+                    chunk_size = st.number_input("Rows per database transaction", min_value=1, max_value=50000, value=BMS_BULK_CHUNK_SIZE)
+                    if st.button("Apply Transactions") and uploaded is not None:
+                        status = st.empty()
+                        try:
+                            applied, rejected, seconds = ingest_transactions(
+                                connection, parse_transaction_upload(uploaded.name, uploaded.getvalue()), int(chunk_size),
+                                progress=lambda done, bad: status.caption(f"Applied {done:,} rows, rejected {bad:,} so far..."),
+                            )
+                        except (ValueError, Error) as e:
+                            st.error(f"Bulk upload failed: {e}")
+                        else:
+                            rate = applied / seconds if seconds else 0
+                            status.success(f"Applied {applied:,} transactions in {seconds:.2f}s ({rate:,.0f} rows/sec); rejected {len(rejected):,}.")
+                            if rejected:
+                                st.caption("Only the rejected rows were not applied; re-upload just those rows after fixing them, not the whole file.")
+                                st.dataframe(rejected, use_container_width=True)
+                                report = io.StringIO()
+                                writer = csv.DictWriter(report, fieldnames=["Row", "Reason"])
+                                writer.writeheader()
+                                writer.writerows(rejected)
+                                st.download_button("📥 Download Rejected Rows", report.getvalue(), file_name="rejected_rows.csv")
+
+                elif choice == "Statements":
+                    st.subheader("Account Statement")
+                    user_id = st.number_input("User ID", min_value=1)
+                    col1, col2 = st.columns(2)
+                    start = col1.date_input("From", value=date.today().replace(day=1))
+                    end = col2.date_input("To (inclusive)", value=date.today())
+                    if st.button("Generate Statement"):
+                        statement = generate_statement(connection, user_id, start, end + timedelta(days=1))
+                        if statement is None:
+                            st.error("User not found.")
+                        else:
+                            col1, col2, col3 = st.columns(3)
+                            col1.metric("Opening balance", f"{statement['opening']:.2f}")
+                            col2.metric("Transactions", len(statement["transactions"]))
+                            col3.metric("Closing balance", f"{statement['closing']:.2f}")
+                            st.table(statement["transactions"])
+                            download_buttons(f"Account Statement — User ID {user_id}", [("Statement", format_statement(statement))], "statement")
+                    if st.button("Refresh All Snapshots"):
+                        with st.spinner("Updating monthly balance snapshots..."):
+                            st.success(f"Added {refresh_all_snapshots(connection)} snapshot(s).")
         except Error as e:
+            # Server gone since the pool was cached, or no free connection in time
             st.error(f"MySQL connection error: {e}")
-            return None
 
-    connection = create_connection()
-    if connection:
-        menu = ["Create User", "View Users", "Deposit", "Withdraw", "View Transactions"]
-        choice = st.sidebar.selectbox("BMS Menu", menu)
-
-        if choice == "Create User":
-            st.subheader("Create New User")
-            with st.form("create_user_form"):
-                name = st.text_input("Name")
-                email = st.text_input("Email")
-                balance = st.number_input("Initial Balance", min_value=0.0)
-                if st.form_submit_button("Create"):
-                    cursor = connection.cursor()
-                    cursor.execute("INSERT INTO users (name, email, balance) VALUES (%s, %s, %s)", (name, email, balance))
-                    connection.commit()
-                    st.success(f"User {name} created successfully.")
-        
-        elif choice == "View Users":
-            st.subheader("All Users")
-            cursor = connection.cursor(dictionary=True)
-            cursor.execute("SELECT * FROM users")
-            users = cursor.fetchall()
-            st.table(users)
-
-        elif choice == "Deposit":
-            st.subheader("Deposit Money")
-            user_id = st.number_input("User ID", min_value=1)
-            amount = st.number_input("Amount", min_value=0.01)
-            if st.button("Deposit"):
-                cursor = connection.cursor()
-                cursor.execute("UPDATE users SET balance = balance + %s WHERE id = %s", (amount, user_id))
-                cursor.execute("INSERT INTO transactions (user_id, type, amount) VALUES (%s, 'deposit', %s)", (user_id, amount))
-                connection.commit()
-                st.success(f"Deposited {amount} to user ID {user_id}")
-
-        elif choice == "Withdraw":
-            st.subheader("Withdraw Money")
-            user_id = st.number_input("User ID", min_value=1)
-            amount = st.number_input("Amount", min_value=0.01)
-            if st.button("Withdraw"):
-                cursor = connection.cursor(dictionary=True)
-                cursor.execute("SELECT balance FROM users WHERE id = %s", (user_id,))
-                user = cursor.fetchone()
-                if user and user['balance'] >= amount:
-                    cursor.execute("UPDATE users SET balance = balance - %s WHERE id = %s", (amount, user_id))
-                    cursor.execute("INSERT INTO transactions (user_id, type, amount) VALUES (%s, 'withdrawal', %s)", (user_id, amount))
-                    connection.commit()
-                    st.success(f"Withdrew {amount} from user ID {user_id}")
-                else:
-                    st.error("Insufficient balance or user not found.")
-        
-        elif choice == "View Transactions":
-            st.subheader("User Transactions")
-            user_id = st.number_input("User ID", min_value=1)
-            if st.button("View"):
-                cursor = connection.cursor(dictionary=True)
-                cursor.execute("SELECT * FROM transactions WHERE user_id = %s ORDER BY created_at DESC", (user_id,))
-                transactions = cursor.fetchall()
-                st.table(transactions)
-        
-        connection.close()
+        with st.sidebar.expander("🔌 MySQL Pool"):
+            stats = pool.stats
+            st.write(f"Size: {pool.size} · In use: {stats['in_use']} · Peak: {stats['peak_in_use']}")
+            st.write(f"Checkouts: {stats['checkouts']}")
+            avg_wait = stats["wait_total"] / stats["checkouts"] if stats["checkouts"] else 0.0
+            st.write(f"Wait avg: {avg_wait * 1000:.1f} ms · max: {stats['wait_max'] * 1000:.1f} ms")
+            st.caption(f"Indexes created by this process: {', '.join(created_indexes) or 'none'}")
 
 elif page == "🔍 Google Search":
     st.title("🔍 Google Search Using Python")
+    from googlesearch import search
     query = st.text_input("Enter your search query")
     num_results = st.slider("Number of results", min_value=1, max_value=20, value=5)
 
@@ -755,3 +3214,57 @@ elif page == "🔍 Google Search":
                     st.error(f"An error occurred during search: {e}")
         else:
             st.warning("Please enter a search query.")
+
+# === Sidebar Metrics ===
+# Rendered last so the counters include the calls made by this run
+st.sidebar.checkbox("Stream Gemini responses", value=True, key="stream_llm")
+
+with st.sidebar.expander("⚡ Gemini Latency"):
+    latency_log = list(get_llm_latency_log())
+    if latency_log:
+        recent = latency_log[-20:]
+        avg_first = sum(row["Time to first token (s)"] for row in recent) / len(recent)
+        avg_total = sum(row["Total (s)"] for row in recent) / len(recent)
+        col1, col2 = st.columns(2)
+        col1.metric("Avg first token", f"{avg_first:.2f}s")
+        col2.metric("Avg total", f"{avg_total:.2f}s")
+        st.table(recent[::-1])
+    else:
+        st.write("No Gemini calls yet.")
+    router_stats = get_model_router().stats()
+    if router_stats:
+        st.markdown("**Rolling latency per model**")
+        st.table(router_stats)
+
+with st.sidebar.expander("🗂 Jobs"):
+    jobs = get_job_queue().list()
+    if jobs:
+        st.button("Refresh", key="jobs_refresh")  # any rerun re-reads job state
+    else:
+        st.write("No background jobs yet.")
+    for job in jobs:
+        st.markdown(f"**{job['title']}** · `{job['id']}` · {job['status']}")
+        if job["status"] in ("queued", "running"):
+            st.progress(job["progress"], text=job["message"] or None)
+            if st.button("Cancel", key=f"cancel_{job['id']}"):
+                get_job_queue().cancel(job["id"])
+                st.rerun()
+        elif job["status"] == "failed":
+            st.error(job["error"])
+        elif job["status"] == "done":
+            if st.checkbox("Show result", key=f"result_{job['id']}"):
+                show_job_result(job)
+
+with st.sidebar.expander("🔑 Social Clients"):
+    st.table(get_client_registry().stats())
+    st.caption(f"Clients are reused across reruns and revalidated when last checked over {CLIENT_REVALIDATE_SECONDS // 60} minutes ago.")
+
+with st.sidebar.expander("🗄 LLM Cache"):
+    cache_stats = get_llm_cache().stats
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Memory hits", cache_stats["memory_hits"])
+    col2.metric("Disk hits", cache_stats["disk_hits"])
+    col3.metric("Misses", cache_stats["misses"])
+    if st.button("Clear LLM Cache"):
+        get_llm_cache().clear()
+        st.success("Cache cleared.")
@@ -0,0 +1,18 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def app():
+    # app.py is a Streamlit script; importing it outside `streamlit run`
+    # executes the Home page in bare mode and exposes the module-level helpers
+    pytest.importorskip("streamlit")
+    os.environ.setdefault("APP_CACHE_DIR", tempfile.mkdtemp(prefix="aihub-test-"))
+    sys.path.insert(0, ROOT)
+    import app as module
+    return module
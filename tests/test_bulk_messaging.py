@@ -0,0 +1,140 @@
+import threading
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class Unlimited:
+    def acquire(self):
+        pass
+
+
+def test_token_bucket_holds_the_rate_after_the_burst(app):
+    clock = FakeClock()
+    bucket = app.TokenBucket(rate=4, capacity=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(10):
+        bucket.acquire()
+
+    # Two tokens from the burst, the other eight at four per second
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_token_bucket_is_shared_by_threads(app):
+    clock = FakeClock()
+    lock = threading.Lock()
+
+    def sleep(seconds):
+        with lock:
+            clock.sleep(seconds)
+
+    bucket = app.TokenBucket(rate=10, capacity=1, clock=clock, sleep=sleep)
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 20 acquisitions, one from the burst: never faster than 19 at ten per second
+    assert clock.now >= 1.9 - 1e-6
+
+
+def test_parse_bulk_csv_keys_rows_by_physical_line(app):
+    items = app.parse_bulk_csv(b'text\nhello\n\n"two\nlines"\n,\nfail\n', ["text"])
+
+    assert [(key.split(":")[0], row["text"]) for key, row in items] == [("2", "hello"), ("5", "two\nlines"), ("7", "fail")]
+    with pytest.raises(ValueError, match="to, body"):
+        app.parse_bulk_csv(b"text\nhi\n", ["to", "body"])
+
+
+def test_checkpoint_resumes_and_retries_only_failures(app, tmp_path):
+    items = app.parse_bulk_csv(b"text\n" + b"\n".join(b"t%d" % i for i in range(6)), ["text"])
+    path = str(tmp_path / "campaign.jsonl")
+    down = {"t2", "t4"}
+    sent = []
+
+    def send(row):
+        if row["text"] in down:
+            raise ConnectionError("provider down")
+        sent.append(row["text"])
+        return f"id-{row['text']}"
+
+    first = app.send_bulk(items, send, Unlimited(), app.BulkCheckpoint(path), retries=1, sleep=lambda s: None)
+    assert (first["sent"], first["failed"], first["attempts"]) == (4, 2, 8)
+
+    down.clear()
+    with open(path, "a") as f:
+        f.write('{"key": "torn')  # a crash mid-write must not break the resume
+    second = app.send_bulk(items, send, Unlimited(), app.BulkCheckpoint(path), retries=1, sleep=lambda s: None)
+
+    assert (second["skipped"], second["sent"], second["failed"]) == (4, 2, 0)
+    assert second["failures"] == []
+    assert sorted(sent) == [f"t{i}" for i in range(6)]
+
+
+def test_bulk_email_sender_closes_its_session(app, monkeypatch):
+    sessions = []
+
+    class FakeSession:
+        def __init__(self, user, password):
+            self.sent, self.closed = [], False
+            sessions.append(self)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.closed = True
+
+        def send(self, message):
+            self.sent.append(message["To"])
+
+    monkeypatch.setattr(app, "SMTPSession", FakeSession)
+    with app.bulk_sender("Email") as send:
+        send({"to": "a@example.com", "subject": "Hi", "body": "Hello"})
+        assert not sessions[0].closed
+
+    assert sessions[0].sent == ["a@example.com"] and sessions[0].closed
+
+
+def test_permanent_errors_fail_without_retrying(app, tmp_path):
+    class Forbidden(Exception):
+        def __init__(self, message):
+            super().__init__(message)
+            self.response = type("Response", (), {"status_code": 403})()
+
+    class RateLimited(Exception):
+        status = 429
+
+    items = app.parse_bulk_csv(b"text\nduplicate\nbusy\n", ["text"])
+    calls = []
+    limiter_calls = []
+
+    class CountingLimiter:
+        def acquire(self):
+            limiter_calls.append(1)
+
+    def send(row):
+        calls.append(row["text"])
+        if row["text"] == "duplicate":
+            raise Forbidden("You are not allowed to create a Tweet with duplicate content.")
+        if calls.count("busy") < 3:
+            raise RateLimited("Too Many Requests")
+        return "id-busy"
+
+    summary = app.send_bulk(items, send, CountingLimiter(), app.BulkCheckpoint(str(tmp_path / "c.jsonl")),
+                            max_workers=1, retries=3, sleep=lambda s: None)
+
+    assert (summary["sent"], summary["failed"]) == (1, 1)
+    assert calls.count("duplicate") == 1 and calls.count("busy") == 3
+    assert len(limiter_calls) == summary["attempts"] == 4
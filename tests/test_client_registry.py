@@ -0,0 +1,80 @@
+import threading
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_registry(app, providers, clock=None):
+    return app.ClientRegistry(providers, revalidate_after=60, clock=clock or FakeClock())
+
+
+def test_clients_are_built_once_and_reused(app):
+    builds = []
+    registry = make_registry(app, {"twitter": (lambda: builds.append(1) or object(), lambda client: None)})
+
+    first = registry.get("twitter")
+
+    assert all(registry.get("twitter") is first for _ in range(3))
+    assert len(builds) == 1
+    row = registry.stats()[0]
+    assert (row["Logins"], row["Reuses"], row["Reuse rate"]) == (1, 3, "75%")
+
+
+def test_stale_clients_are_revalidated_lazily(app):
+    clock = FakeClock()
+    valid = {"ok": True}
+    validations = []
+
+    def validate(client):
+        validations.append(client)
+        if not valid["ok"]:
+            raise RuntimeError("login_required")
+
+    registry = make_registry(app, {"instagram": (object, validate)}, clock)
+    first = registry.get("instagram")
+    clock.now = 30
+    assert registry.get("instagram") is first and validations == []
+
+    clock.now = 100
+    assert registry.get("instagram") is first and len(validations) == 1
+
+    valid["ok"] = False
+    clock.now = 200
+    assert registry.get("instagram") is not first
+    assert registry.counters["instagram"]["logins"] == 2
+
+
+def test_slow_login_does_not_block_other_providers(app):
+    login_started, release_login = threading.Event(), threading.Event()
+
+    def slow_instagram_login():
+        login_started.set()
+        release_login.wait(5)
+        return object()
+
+    registry = make_registry(app, {"instagram": (slow_instagram_login, lambda c: None), "twitter": (object, lambda c: None)})
+    thread = threading.Thread(target=registry.get, args=("instagram",))
+    thread.start()
+    login_started.wait(5)
+
+    got_twitter = threading.Event()
+    threading.Thread(target=lambda: registry.get("twitter") and got_twitter.set(), daemon=True).start()
+    try:
+        assert got_twitter.wait(1), "twitter get() waited for the Instagram login"
+    finally:
+        release_login.set()
+        thread.join()
+
+
+def test_invalidate_forces_a_new_login(app):
+    registry = make_registry(app, {"instagram": (object, lambda c: None)})
+    first = registry.get("instagram")
+
+    registry.invalidate("instagram")
+
+    assert registry.get("instagram") is not first
@@ -0,0 +1,105 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("bs4")
+
+
+def page(title, *links):
+    anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+    return f"<html><body><h1>{title}</h1><p>{title} body</p>{anchors}</body></html>"
+
+
+class Site(BaseHTTPRequestHandler):
+    pages = {}
+    requested = []
+
+    def do_GET(self):
+        Site.requested.append(self.path)
+        content_type, body = Site.pages.get(self.path, (None, None))
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the crawler hung up after reading the headers
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    Site.requested = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Site)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    yield base, server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def html(text):
+    return "text/html; charset=utf-8", text.encode()
+
+
+def test_crawl_follows_depth_domain_and_dedupes(app, site):
+    base, port = site
+    Site.pages = {
+        "/": html(page("Home", "/a", "/b", "/copy", "/report.pdf", f"http://localhost:{port}/external", "mailto:x@example.com")),
+        "/a": html(page("Alpha", "/deep")),
+        "/b": html(page("Beta")),
+        "/copy": html(page("Home", "/a", "/b", "/copy", "/report.pdf")),  # same text as "/"
+        "/deep": html(page("Deep")),
+        "/report.pdf": ("application/pdf", b"%PDF" + b"0" * 1000),
+        "/external": html(page("External")),
+    }
+
+    text, stats = app.crawl_website(base + "/", max_depth=1, max_pages=25, concurrency=4, host_rate=1000)
+
+    assert "Alpha body" in text and "Beta body" in text
+    assert "Deep body" not in text                      # depth 2
+    assert "/external" not in Site.requested            # other host (localhost vs 127.0.0.1)
+    assert "/report.pdf" not in Site.requested          # skipped by extension
+    assert text.count("Home body") == 1 and stats["duplicates"] == 1
+    assert stats["fetched"] == 4 and stats["errors"] == 0
+
+
+def test_crawl_respects_page_budget(app, site):
+    base, _ = site
+    Site.pages = {"/": html(page("Home", *[f"/p{i}" for i in range(10)]))}
+    Site.pages.update({f"/p{i}": html(page(f"Page {i}")) for i in range(10)})
+
+    _, stats = app.crawl_website(base + "/", max_depth=2, max_pages=4, concurrency=4, host_rate=1000)
+
+    assert stats["fetched"] == 4 and len(Site.requested) == 4
+
+
+def test_non_html_responses_are_skipped(app, site):
+    base, _ = site
+    Site.pages = {
+        "/": html(page("Home", "/download")),
+        "/download": ("application/octet-stream", b"x" * 5_000_000),
+    }
+
+    text, stats = app.crawl_website(base + "/", max_depth=1, max_pages=10, concurrency=2, host_rate=1000)
+
+    assert stats["skipped"] == 1 and "Home body" in text
+    assert "/download" in Site.requested
+
+
+def test_crawl_with_no_pages_reports_an_error(app, site):
+    base, _ = site
+    Site.pages = {}
+
+    text, stats = app.crawl_website(base + "/missing", max_depth=1, max_pages=5, concurrency=2, host_rate=1000)
+
+    assert text.startswith("❌") and stats["errors"] == 1
@@ -0,0 +1,85 @@
+import pytest
+
+
+class Unavailable(Exception):
+    code = 503
+
+
+class FakeModel:
+    def __init__(self, name, failures):
+        self.name = name
+        self.failures = list(failures)
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return f"{self.name}: {messages}"
+
+    def stream(self, messages):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        yield from ["Hel", "lo"]
+
+
+def make_router(app, failures, retries=3):
+    models = {name: FakeModel(name, errors) for name, errors in failures.items()}
+    sleeps = []
+    router = app.ModelRouter(models.__getitem__, routes={"chat": list(failures)}, retries=retries, sleep=sleeps.append)
+    return router, models, sleeps
+
+
+def test_permanent_error_falls_back_without_retrying(app):
+    router, models, sleeps = make_router(app, {"pro": [ValueError("prompt has 500 tokens")], "flash": []})
+
+    model, response = router.invoke("chat", "hi")
+
+    assert (model, response) == ("flash", "flash: hi")
+    assert models["pro"].calls == 1 and sleeps == []
+    assert router.counts["flash"]["fallbacks"] == 1
+
+
+def test_transient_error_is_retried_with_backoff(app):
+    router, models, sleeps = make_router(app, {"pro": [Unavailable("busy"), TimeoutError()], "flash": []})
+
+    model, _ = router.invoke("chat", "hi")
+
+    assert model == "pro"
+    assert models["pro"].calls == 3 and models["flash"].calls == 0
+    assert len(sleeps) == 2 and all(0 <= s <= app.LLM_BACKOFF_CAP for s in sleeps)
+
+
+def test_retryable_error_wrapped_by_client_library(app):
+    try:
+        try:
+            raise Unavailable("busy")
+        except Unavailable as e:
+            raise RuntimeError("Error calling model") from e
+    except RuntimeError as wrapped:
+        assert app.is_retryable(wrapped)
+
+
+def test_all_models_failing_raises_with_every_error(app):
+    router, _, _ = make_router(app, {"pro": [ValueError("bad request")], "flash": [ValueError("blocked")]})
+
+    with pytest.raises(RuntimeError, match="pro: bad request; flash: blocked"):
+        router.invoke("chat", "hi")
+
+
+def test_stream_falls_back_before_the_first_chunk(app):
+    router, _, _ = make_router(app, {"pro": [ValueError("quota")], "flash": []})
+
+    model, chunks = router.stream("chat", "hi")
+
+    assert model == "flash" and "".join(chunks) == "Hello"
+
+
+def test_slow_first_choice_yields_to_faster_model(app):
+    router, _, _ = make_router(app, {"pro": [], "flash": []})
+    for _ in range(20):
+        router.record("pro", app.LLM_SLOW_P95 + 5)
+        router.record("flash", 0.1)
+
+    assert router.candidates("chat") == ["flash", "pro"]
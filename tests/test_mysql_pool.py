@@ -0,0 +1,96 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+
+class SQLiteConnection:
+    def __init__(self, pool):
+        self.pool = pool
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+
+    def cursor(self):
+        return self.db.cursor()
+
+    def close(self):
+        self.pool.returned += 1
+
+
+class SQLitePool:
+    # Stand-in for mysql.connector.pooling.MySQLConnectionPool
+    def __init__(self, size, config, fail_checkouts=0):
+        self.size, self.fail_checkouts = size, fail_checkouts
+        self.handed_out = self.returned = 0
+
+    def get_connection(self):
+        if self.fail_checkouts:
+            self.fail_checkouts -= 1
+            raise sqlite3.OperationalError("server has gone away")
+        if self.handed_out - self.returned >= self.size:
+            raise RuntimeError("pool exhausted")  # what the semaphore must prevent
+        self.handed_out += 1
+        return SQLiteConnection(self)
+
+
+def make_pool(app, size=2, **kwargs):
+    return app.MySQLPool(size=size, config={}, pool_factory=lambda size, config: SQLitePool(size, config, **kwargs))
+
+
+def test_connection_is_returned_after_an_exception(app):
+    pool = make_pool(app)
+
+    with pytest.raises(ZeroDivisionError):
+        with pool.connection() as connection:
+            connection.cursor().execute("SELECT 1")
+            1 / 0
+
+    assert pool.pool.returned == 1
+    assert (pool.stats["checkouts"], pool.stats["in_use"], pool.stats["peak_in_use"]) == (1, 0, 1)
+    with pool.connection(), pool.connection():  # both slots are free again
+        assert pool.stats["in_use"] == 2
+
+
+def test_failed_checkout_releases_its_slot(app):
+    pool = make_pool(app, size=1, fail_checkouts=1)
+
+    with pytest.raises(sqlite3.OperationalError):
+        with pool.connection():
+            pass
+
+    with pool.connection(timeout=0.1):
+        pass
+    assert pool.stats["checkouts"] == 1 and pool.stats["in_use"] == 0
+
+
+def test_checkout_times_out_when_the_pool_is_exhausted(app):
+    errors = pytest.importorskip("mysql.connector")
+    pool = make_pool(app, size=1)
+
+    with pool.connection():
+        start = time.perf_counter()
+        with pytest.raises(errors.Error, match="Timed out"):
+            with pool.connection(timeout=0.05):
+                pass
+        assert time.perf_counter() - start >= 0.05
+    assert pool.stats["in_use"] == 0
+
+
+def test_waiters_get_the_next_free_connection(app):
+    pool = make_pool(app, size=1)
+    holding, waited = threading.Event(), []
+
+    def hold():
+        with pool.connection():
+            holding.set()
+            time.sleep(0.1)
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    holding.wait(5)
+    with pool.connection(timeout=5):
+        waited.append(pool.stats["wait_max"])
+    thread.join()
+
+    assert waited[0] >= 0.05
+    assert pool.stats["checkouts"] == 2 and pool.stats["peak_in_use"] == 1
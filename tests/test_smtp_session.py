@@ -0,0 +1,102 @@
+import smtplib
+
+import pytest
+
+
+class FakeSMTP:
+    # Drops the connection after `capacity` messages, like a per-session cap
+    instances = []
+
+    def __init__(self, host, port, timeout=None, capacity=3, refuse=(), login_error=None):
+        self.capacity, self.refuse, self.login_error = capacity, refuse, login_error
+        self.delivered, self.quit_called = [], False
+        FakeSMTP.instances.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        if self.login_error:
+            raise self.login_error
+
+    def send_message(self, message):
+        if len(self.delivered) >= self.capacity:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        if message["To"] in self.refuse:
+            raise smtplib.SMTPRecipientsRefused({message["To"]: (550, b"No such user")})
+        self.delivered.append(message)
+
+    def quit(self):
+        self.quit_called = True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def factory():
+    FakeSMTP.instances = []
+    return FakeSMTP
+
+
+def test_session_reconnects_transparently(app, factory):
+    with app.SMTPSession("me@example.com", "secret", factory=factory) as session:
+        for i in range(7):
+            session.send(app.build_email("me@example.com", f"u{i}@example.com", "Hi", "Body"))
+
+    delivered = [m["To"] for smtp in factory.instances for m in smtp.delivered]
+    assert delivered == [f"u{i}@example.com" for i in range(7)]
+    assert (session.stats["sent"], session.stats["connects"], session.stats["reconnects"]) == (7, 3, 2)
+    assert factory.instances[-1].quit_called and session.server is None
+
+
+def test_build_email_is_proper_mime(app):
+    message = app.build_email("me@example.com", "you@example.com", "Grüße ✓", "Hallo", html="<b>Hallo</b>")
+
+    assert message.get_content_type() == "multipart/alternative"
+    assert message["Message-ID"]
+    assert "=?utf-8?" in message.as_string()  # non-ASCII subject is header-encoded
+
+
+def test_mail_merge_reports_failures_by_csv_line(app, factory):
+    rows = app.parse_merge_csv(b"email,name\na@example.com,Ann\n,skipped\n\nbad@example.com,Bob\nc@example.com,Cy\nd@example.com,\n")
+    make = lambda host, port, timeout=None: factory(host, port, refuse={"bad@example.com"})
+
+    with app.SMTPSession("me@example.com", "secret", factory=make) as session:
+        summary = app.mail_merge(session, rows, "Hi {name}", "Hello {name}")
+
+    assert [line for line, _ in rows] == [2, 5, 6, 7]
+    assert (summary["sent"], summary["failed"]) == (3, 1)
+    assert summary["failures"][0]["Row"] == 5
+    assert factory.instances[0].delivered[0]["Subject"] == "Hi Ann"
+
+
+def test_missing_placeholder_fails_only_that_row(app, factory):
+    rows = app.parse_merge_csv(b"email\na@example.com\n")
+
+    with app.SMTPSession("me@example.com", "secret", factory=factory) as session:
+        summary = app.mail_merge(session, rows, "Hi", "Hello {name}")
+
+    assert summary["failures"] == [{"Row": 2, "Email": "a@example.com", "Error": "no column named 'name' in the CSV"}]
+
+
+def test_login_failure_stops_the_batch(app, factory):
+    rows = app.parse_merge_csv(b"email\na@example.com\nb@example.com\n")
+    make = lambda host, port, timeout=None: factory(host, port, login_error=smtplib.SMTPAuthenticationError(535, b"Bad credentials"))
+
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        with app.SMTPSession("me@example.com", "wrong", factory=make) as session:
+            app.mail_merge(session, rows, "Hi", "Hello")
+    assert len(factory.instances) == 1
+
+
+def test_templates_keep_non_placeholder_braces(app, factory):
+    rows = app.parse_merge_csv(b"email,name\na@example.com,Ann\n")
+    html = "<style>p { color: red }</style><p>Hi {name}, {name.upper} {}</p>"
+
+    with app.SMTPSession("me@example.com", "secret", factory=factory) as session:
+        summary = app.mail_merge(session, rows, "Hi {name}", "Hello {name}", html)
+
+    assert summary["sent"] == 1
+    html_part = factory.instances[0].delivered[0].get_body(("html",)).get_content()
+    assert "p { color: red }" in html_part and "Hi Ann, {name.upper} {}" in html_part
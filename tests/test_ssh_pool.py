@@ -0,0 +1,73 @@
+import subprocess
+import time
+
+
+class FakeTransport:
+    def __init__(self, returncode=0, stdout="ok\n", stderr="", error=None):
+        self.calls = []
+        self.returncode, self.stdout, self.stderr, self.error = returncode, stdout, stderr, error
+
+    def __call__(self, args, **kwargs):
+        self.calls.append(args)
+        if self.error:
+            raise self.error
+        return subprocess.CompletedProcess(args, self.returncode, self.stdout, self.stderr)
+
+
+def test_run_multiplexes_over_control_master(app, tmp_path):
+    transport = FakeTransport()
+    pool = app.SSHPool(control_dir=str(tmp_path), runner=transport)
+    pool.multiplex = True
+
+    returncode, stdout, _, seconds = pool.run("root", "10.0.0.1", "uptime")
+
+    assert (returncode, stdout) == (0, "ok\n")
+    assert seconds >= 0
+    args = transport.calls[0]
+    assert args[0] == "ssh" and args[-2:] == ["root@10.0.0.1", "uptime"]
+    assert "ControlMaster=auto" in args
+    assert f"ControlPath={tmp_path}/%C" in args
+
+
+def test_transport_errors_become_failed_results(app, tmp_path):
+    pool = app.SSHPool(control_dir=str(tmp_path), runner=FakeTransport(error=subprocess.TimeoutExpired("ssh", 5)))
+
+    returncode, stdout, stderr, _ = pool.run("root", "10.0.0.1", "uptime")
+
+    assert returncode == -1 and stdout == ""
+    assert "timed out" in stderr
+    assert sum(row["Calls"] for row in pool.histogram()) == 1
+
+
+def test_idle_masters_are_closed(app, tmp_path):
+    transport = FakeTransport()
+    pool = app.SSHPool(control_dir=str(tmp_path), idle_timeout=60, runner=transport)
+    pool.multiplex = True
+    pool.run("root", "10.0.0.1", "uptime")
+    pool.last_used[("root", "10.0.0.1")] = time.time() - 120
+
+    pool.evict_idle()
+
+    assert transport.calls[-1][-3:] == ["-O", "exit", "root@10.0.0.1"]
+    assert pool.last_used == {}
+
+
+def test_failed_teardown_does_not_break_other_hosts(app, tmp_path):
+    class HangingExit(FakeTransport):
+        def __call__(self, args, **kwargs):
+            if "-O" in args:
+                self.calls.append(args)
+                raise subprocess.TimeoutExpired(args, 10)
+            return super().__call__(args, **kwargs)
+
+    transport = HangingExit()
+    pool = app.SSHPool(control_dir=str(tmp_path), idle_timeout=60, runner=transport)
+    pool.multiplex = True
+    pool.run("root", "h1", "uptime")
+    pool.last_used[("root", "h1")] = time.time() - 120
+
+    returncode, stdout, _, _ = pool.run("root", "h2", "uptime")
+
+    assert (returncode, stdout) == (0, "ok\n")
+    assert any("-O" in args and "root@h1" in args for args in transport.calls)
+    assert ("root", "h1") not in pool.last_used